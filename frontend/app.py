@@ -1,9 +1,17 @@
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
 import os
+import tempfile
+
+from data_loader import huella_origen, listar_partes, load_dataset
+from exportar import EXPORT_DIR, FORMATOS, exportar, formatos_para, lotes_carpeta, lotes_seleccion
+from filtro_index import IndiceFiltros
+from paginacion import TablaPaginada
+from resumen import RESUMEN_COLUMNS, calcular_resumen, cargar_resumen
 
 # Configuración de la página
 st.set_page_config(
@@ -19,32 +27,100 @@ st.markdown("*Análisis de 50K+ canciones y 9.7M+ interacciones de usuarios*")
 st.markdown("---")
 
 # Función para cargar datos Parquet de Hive
-@st.cache_data
-def load_hive_parquet(folder_path):
-    """Carga archivos Parquet generados por Hive (sin extensión .parquet)"""
-    if not os.path.exists(folder_path):
+# cache_resource (no cache_data): devuelve el mismo DataFrame sin copiarlo, así las
+# columnas siguen apuntando al memory map de data/.cache. Las páginas no lo modifican.
+@st.cache_resource
+def load_hive_parquet(folder_path, columns=None, filters=None):
+    """Carga archivos Parquet generados por Hive (sin extensión .parquet)
+
+    Solo lee las columnas pedidas y empuja los filtros al scan del dataset.
+    """
+    try:
+        return load_dataset(folder_path, columns=columns, filters=filters)
+    except Exception as e:
+        st.warning(f"Error cargando {folder_path}: {e}")
+        return None
+
+# Índice de filtros de music_with_stats: se construye una vez por proceso
+@st.cache_resource
+def load_filter_index(folder_path, columns):
+    """Construye el IndiceFiltros sobre el DataFrame cacheado de la carpeta"""
+    df = load_hive_parquet(folder_path, columns=columns)
+    return IndiceFiltros(df) if df is not None else None
+
+# Tablas paginadas: solo se leen los footers; la huella invalida la entrada si cambian los archivos
+@st.cache_resource
+def load_paginated_table(folder_path, huella):
+    """Abre la carpeta como TablaPaginada (None si no tiene part files)"""
+    if not listar_partes(folder_path):
         return None
+    return TablaPaginada(folder_path)
+
+def paginated_table(tabla, key):
+    """Muestra una página de la tabla; el orden por columna usa permutaciones precalculadas"""
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        sort_col = st.selectbox("Ordenar por:", ['(sin orden)'] + tabla.columnas_ordenables(), key=f"{key}_sort")
+    with col2:
+        descending = st.checkbox("Descendente", value=True, key=f"{key}_desc")
+    with col3:
+        page_size = st.selectbox("Filas por página:", [25, 50, 100, 200], index=1, key=f"{key}_size")
+    with col4:
+        num_pages = max(1, -(-tabla.num_rows // page_size))
+        page_num = st.number_input(f"Página (de {num_pages:,}):", min_value=1, max_value=num_pages, value=1, key=f"{key}_page")
     
-    # Buscar todos los archivos que NO sean _SUCCESS ni carpetas $folder$
-    files = []
-    for f in os.listdir(folder_path):
-        if f != '_SUCCESS' and not f.endswith('$folder$') and not f.startswith('.'):
-            full_path = os.path.join(folder_path, f)
-            if os.path.isfile(full_path):
-                files.append(full_path)
+    orden = None if sort_col == '(sin orden)' else tabla.orden_por(sort_col, descending)
+    offset = (page_num - 1) * page_size
+    page_df = tabla.leer_pagina(offset, page_size, orden=orden).to_pandas()
     
-    if not files:
-        return None
+    st.dataframe(page_df, use_container_width=True)
+    st.caption(f"Filas {offset + 1:,}–{offset + len(page_df):,} de {tabla.num_rows:,}")
+
+# Tabla Arrow de la carpeta (para exportar): se convierte una vez por proceso, no en cada rerun
+@st.cache_resource
+def load_arrow_table(folder_path, columns):
+    """pa.Table del DataFrame cacheado de la carpeta (None si no cargó)"""
+    df = load_hive_parquet(folder_path, columns=columns)
+    return pa.Table.from_pandas(df, preserve_index=False) if df is not None else None
+
+# Descargas bajo demanda: el archivo solo se genera al pulsar "Preparar descarga"
+def export_widget(key, file_stem, schema, generar, version=None):
+    """
+    Selector de formato + botón que exporta por lotes con generar() -> (schema, batches).
+    Cada widget (key fija) guarda a lo sumo un archivo en EXPORT_DIR: si cambia el
+    formato o la versión de los datos (p.ej. los filtros), el archivo anterior se borra.
+    """
+    col1, col2 = st.columns(2)
+    with col1:
+        formato = st.selectbox("Formato de descarga:", formatos_para(schema), key=f"{key}_formato")
+    ext, mime = FORMATOS[formato]
+    with col2:
+        preparar = st.button("⚙️ Preparar descarga", key=f"{key}_preparar")
+    
+    anterior = st.session_state.get(key)
+    if anterior and (preparar or anterior[1:] != (formato, version)):
+        if os.path.exists(anterior[0]):
+            os.remove(anterior[0])
+        del st.session_state[key]
     
-    dfs = []
-    for file in files:
-        try:
-            df = pd.read_parquet(file)
-            dfs.append(df)
-        except Exception as e:
-            st.warning(f"Error cargando {file}: {e}")
+    if preparar:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=f'.{ext}', dir=EXPORT_DIR)
+        os.close(fd)
+        with st.spinner("Generando archivo..."):
+            exportar(*generar(), path, formato)
+        st.session_state[key] = (path, formato, version)
     
-    return pd.concat(dfs, ignore_index=True) if dfs else None
+    preparado = st.session_state.get(key)
+    if preparado and os.path.exists(preparado[0]):
+        with open(preparado[0], 'rb') as f:
+            st.download_button(
+                label=f"📥 Descargar {file_stem}.{ext}",
+                data=f,
+                file_name=f'{file_stem}.{ext}',
+                mime=mime,
+                key=f"{key}_descargar"
+            )
 
 # Sidebar - Navegación
 st.sidebar.title("📊 Navegación")
@@ -76,39 +152,39 @@ st.sidebar.info("""
 if page == "🏠 Resumen General":
     st.header("🏠 Resumen General del Dataset")
     
-    # Cargar datos principales
-    music_stats = load_hive_parquet("data/cleaned/music_with_stats")
+    # Agregados precalculados (python resumen.py); si faltan o están desactualizados
+    # se calculan en vivo desde music_with_stats
+    resumen = cargar_resumen()
+    if resumen is None:
+        music_stats = load_hive_parquet("data/cleaned/music_with_stats", columns=RESUMEN_COLUMNS)
+        if music_stats is not None:
+            resumen = calcular_resumen(music_stats)
     
-    if music_stats is not None:
+    if resumen is not None:
+        kpis = resumen['kpis'].to_pylist()[0]
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Canciones", f"{len(music_stats):,}")
+            st.metric("Total Canciones", f"{kpis['total_songs']:,}")
         with col2:
-            total_plays = music_stats['total_plays'].sum()
-            st.metric("Total Reproducciones", f"{int(total_plays):,}")
+            st.metric("Total Reproducciones", f"{kpis['total_plays']:,}")
         with col3:
-            total_listeners = music_stats['unique_listeners'].sum()
-            st.metric("Total Oyentes", f"{int(total_listeners):,}")
+            st.metric("Total Oyentes", f"{kpis['total_listeners']:,}")
         with col4:
-            avg_popularity = music_stats['popularity_score'].mean()
-            st.metric("Popularidad Promedio", f"{avg_popularity:,.0f}")
+            st.metric("Popularidad Promedio", f"{kpis['avg_popularity']:,.0f}")
         
         st.markdown("---")
         
         # Top 10 canciones más populares
         st.subheader("🔥 Top 10 Canciones Más Populares")
-        top_songs = music_stats.nlargest(10, 'popularity_score')[
-            ['title', 'artist', 'total_plays', 'unique_listeners', 'popularity_score']
-        ]
-        st.dataframe(top_songs, use_container_width=True)
+        st.dataframe(resumen['top_songs'].to_pandas(), use_container_width=True)
         
         # Distribución de géneros
         st.subheader("🎸 Distribución de Géneros")
-        genre_counts = music_stats['genre'].value_counts().head(15)
+        genre_counts = resumen['genre_counts'].slice(0, 15).to_pandas()
         fig = px.bar(
-            x=genre_counts.values,
-            y=genre_counts.index,
+            x=genre_counts['count'],
+            y=genre_counts['genre'],
             orientation='h',
             labels={'x': 'Número de Canciones', 'y': 'Género'},
             title="Top 15 Géneros Musicales"
@@ -117,11 +193,10 @@ if page == "🏠 Resumen General":
         
         # Distribución por década
         st.subheader("📅 Distribución por Década")
-        music_stats['decade'] = (music_stats['year'] // 10) * 10
-        decade_counts = music_stats[music_stats['year'] > 0]['decade'].value_counts().sort_index()
+        decade_counts = resumen['decade_counts'].to_pandas()
         fig = px.line(
-            x=decade_counts.index,
-            y=decade_counts.values,
+            x=decade_counts['decade'],
+            y=decade_counts['count'],
             labels={'x': 'Década', 'y': 'Número de Canciones'},
             title="Canciones por Década",
             markers=True
@@ -191,19 +266,21 @@ elif page == "📉 Tendencias (Job 4)":
         # Selector de tabla
         selected_table = st.selectbox("Selecciona una tabla:", available_tables)
         
-        df = load_hive_parquet(f"{trends_dir}/{selected_table}")
-        if df is not None:
+        trend_folder = f"{trends_dir}/{selected_table}"
+        tabla = load_paginated_table(trend_folder, huella_origen(trend_folder))
+        if tabla is not None:
             st.subheader(f"📊 {selected_table.replace('_', ' ').title()}")
-            st.dataframe(df, use_container_width=True)
+            paginated_table(tabla, f"trend_{selected_table}")
             
             # Intentar crear visualización automática
-            numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+            numeric_cols = [f.name for f in tabla.schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
             if len(numeric_cols) >= 2:
                 col1, col2 = st.columns(2)
                 with col1:
-                    st.metric(f"Total registros", len(df))
+                    st.metric(f"Total registros", tabla.num_rows)
                 with col2:
-                    st.metric(f"Promedio {numeric_cols[0]}", f"{df[numeric_cols[0]].mean():.2f}")
+                    first_col = load_hive_parquet(trend_folder, columns=[numeric_cols[0]])
+                    st.metric(f"Promedio {numeric_cols[0]}", f"{first_col[numeric_cols[0]].mean():.2f}")
         else:
             st.warning(f"No se pudo cargar {selected_table}")
     else:
@@ -243,24 +320,24 @@ elif page == "🤖 Recomendaciones ALS (Job 5)":
         
         selected_rec = st.selectbox("Selecciona tipo de recomendación:", available_recs)
         
-        df = load_hive_parquet(f"{recs_dir}/{selected_rec}")
-        if df is not None:
+        rec_folder = f"{recs_dir}/{selected_rec}"
+        tabla = load_paginated_table(rec_folder, huella_origen(rec_folder))
+        if tabla is not None:
             st.subheader(f"📊 {selected_rec.replace('_', ' ').title()}")
             
-            # Mostrar info de las columnas
-            st.write(f"**Columnas disponibles:** {', '.join(df.columns.tolist())}")
-            st.write(f"**Total de registros:** {len(df):,}")
+            # Mostrar info de las columnas (desde los metadatos Parquet, sin leer datos)
+            st.write(f"**Columnas disponibles:** {', '.join(tabla.schema.names)}")
+            st.write(f"**Total de registros:** {tabla.num_rows:,}")
             
-            # Mostrar primeros registros
-            st.dataframe(df.head(50), use_container_width=True)
+            # Mostrar solo la página pedida
+            paginated_table(tabla, f"recs_{selected_rec}")
             
-            # Descargar
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label=f"📥 Descargar {selected_rec}",
-                data=csv,
-                file_name=f'{selected_rec}.csv',
-                mime='text/csv'
+            # Descargar (se lee la carpeta por lotes desde el disco)
+            export_widget(
+                f"export_{selected_rec}",
+                selected_rec,
+                tabla.schema,
+                lambda: lotes_carpeta(rec_folder)
             )
         else:
             st.warning(f"No se pudo cargar {selected_rec}")
@@ -274,7 +351,9 @@ elif page == "🤖 Recomendaciones ALS (Job 5)":
 elif page == "📊 Datos Limpios (Job 2)":
     st.header("📊 Exploración de Datos Limpios")
     
-    music_stats = load_hive_parquet("data/cleaned/music_with_stats")
+    clean_columns = ['track_id', 'title', 'artist', 'genre', 'year', 'total_plays', 'unique_listeners', 'popularity_score']
+    music_stats = load_hive_parquet("data/cleaned/music_with_stats", columns=clean_columns)
+    filter_index = load_filter_index("data/cleaned/music_with_stats", clean_columns)
     
     if music_stats is not None:
         st.subheader("🔍 Explorar Dataset")
@@ -283,50 +362,47 @@ elif page == "📊 Datos Limpios (Job 2)":
         st.write(f"**Total de canciones:** {len(music_stats):,}")
         st.write(f"**Columnas:** {', '.join(music_stats.columns.tolist())}")
         
-        # Filtros
+        # Filtros (géneros y rango de años vienen precalculados en el índice)
         col1, col2, col3 = st.columns(3)
         with col1:
-            genres = ['Todos'] + sorted(music_stats['genre'].unique().tolist())
+            genres = ['Todos'] + filter_index.genres
             selected_genre = st.selectbox("Filtrar por género:", genres)
         with col2:
-            years_valid = music_stats[music_stats['year'] > 0]['year']
-            if len(years_valid) > 0:
-                min_year = int(years_valid.min())
-                max_year = int(years_valid.max())
+            if filter_index.year_min is not None:
+                min_year = filter_index.year_min
+                max_year = filter_index.year_max
                 year_range = st.slider("Rango de años:", min_year, max_year, (min_year, max_year))
             else:
                 year_range = (1900, 2025)
         with col3:
             min_plays = st.number_input("Mínimo de reproducciones:", min_value=0, value=0)
         
-        # Aplicar filtros
-        filtered_df = music_stats.copy()
-        if selected_genre != 'Todos':
-            filtered_df = filtered_df[filtered_df['genre'] == selected_genre]
-        filtered_df = filtered_df[
-            (filtered_df['year'] >= year_range[0]) & 
-            (filtered_df['year'] <= year_range[1]) &
-            (filtered_df['total_plays'] >= min_plays)
-        ]
+        # Aplicar filtros: el índice devuelve posiciones de fila, sin copiar el DataFrame
+        rows = filter_index.filtrar(
+            genre=None if selected_genre == 'Todos' else selected_genre,
+            year_range=year_range,
+            min_plays=min_plays
+        )
         
-        st.write(f"**{len(filtered_df):,} canciones encontradas**")
+        st.write(f"**{len(rows):,} canciones encontradas**")
         
         # Mostrar datos
         display_cols = ['title', 'artist', 'genre', 'year', 'total_plays', 'unique_listeners']
-        display_cols = [col for col in display_cols if col in filtered_df.columns]
+        display_cols = [col for col in display_cols if col in music_stats.columns]
         
         st.dataframe(
-            filtered_df[display_cols].head(100),
+            music_stats.iloc[rows[:100]][display_cols],
             use_container_width=True
         )
         
-        # Descargar datos filtrados
-        csv = filtered_df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Descargar datos filtrados (CSV)",
-            data=csv,
-            file_name='music_data_filtered.csv',
-            mime='text/csv'
+        # Descargar datos filtrados (solo las filas seleccionadas, por lotes)
+        music_table = load_arrow_table("data/cleaned/music_with_stats", clean_columns)
+        export_widget(
+            "export_limpios",
+            'music_data_filtered',
+            music_table.schema,
+            lambda: lotes_seleccion(music_table, rows),
+            version=(selected_genre, tuple(year_range), min_plays)
         )
     else:
         st.error("No se pudieron cargar los datos")
@@ -29,7 +29,7 @@ def convert_parquet_folder(folder_path, output_json):
         print(f"[OK] {output_json} ({len(combined)} records)")
 
 def convert_mapreduce_output(folder_path, output_json):
-    """Convierte output de MapReduce (TSV) a JSON"""
+    """Convierte output de MapReduce (TSV, o Parquet de job7_10_columnar.py) a JSON"""
     part_files = list(Path(folder_path).glob("part-*"))
 
     if not part_files:
@@ -38,6 +38,11 @@ def convert_mapreduce_output(folder_path, output_json):
 
     data = []
     for file in part_files:
+        if file.suffix == '.parquet':
+            # Mismas filas que el TSV: lista de campos como texto
+            df = pd.read_parquet(file)
+            data.extend([[str(v) for v in row] for row in df.itertuples(index=False)])
+            continue
         with open(file, 'r', encoding='utf-8', errors='ignore') as f:
             for line in f:
                 line = line.strip()
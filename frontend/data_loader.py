@@ -0,0 +1,163 @@
+"""
+Carga de tablas Parquet generadas por Hive/Spark como un único dataset de pyarrow
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Caché en disco compartida por todos los procesos del dashboard
+CACHE_DIR = os.path.join('data', '.cache')
+HUELLA_KEY = b'maestro.huella'
+
+
+def listar_partes(folder_path):
+    """Lista los part files de una carpeta Hive (sin _SUCCESS, $folder$ ni ocultos)"""
+    if not os.path.isdir(folder_path):
+        return []
+
+    files = []
+    for f in sorted(os.listdir(folder_path)):
+        if f != '_SUCCESS' and not f.endswith('$folder$') and not f.startswith('.'):
+            full_path = os.path.join(folder_path, f)
+            if os.path.isfile(full_path):
+                files.append(full_path)
+    return files
+
+
+def abrir_dataset(folder_path):
+    """Abre todos los part files de la carpeta como un solo dataset Parquet"""
+    files = listar_partes(folder_path)
+    if not files:
+        return None
+    # Hive no pone extensión .parquet, así que pasamos la lista explícita de archivos
+    return ds.dataset(files, format='parquet')
+
+
+def _como_expresion(filters):
+    """Acepta una expresión de pyarrow o filtros estilo pandas [('year', '>', 0), ...]"""
+    if filters is None or isinstance(filters, ds.Expression):
+        return filters
+    return pq.filters_to_expression(filters)
+
+
+def leer_tabla(folder_path, columns=None, filters=None):
+    """
+    Lee la carpeta como tabla Arrow leyendo solo las columnas pedidas.
+    Los filtros se empujan al scan (row groups descartados por estadísticas).
+    """
+    dataset = abrir_dataset(folder_path)
+    if dataset is None:
+        return None
+
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+
+    # use_threads=True: los archivos se decodifican en paralelo
+    return dataset.to_table(columns=columns, filter=_como_expresion(filters), use_threads=True)
+
+
+def huella_origen(folder_path):
+    """Huella de la carpeta: nombre, mtime y tamaño de cada part file más el _SUCCESS"""
+    huella = []
+    for f in listar_partes(folder_path):
+        st = os.stat(f)
+        huella.append([os.path.basename(f), st.st_mtime_ns, st.st_size])
+
+    success = os.path.join(folder_path, '_SUCCESS')
+    if os.path.exists(success):
+        huella.append(['_SUCCESS', os.stat(success).st_mtime_ns, 0])
+
+    return json.dumps(huella)
+
+
+def _ruta_cache(folder_path, columns, filters, cache_dir):
+    """Un archivo .arrow por combinación de carpeta, columnas y filtros"""
+    clave = repr((os.path.abspath(folder_path), columns, str(_como_expresion(filters))))
+    digest = hashlib.sha1(clave.encode('utf-8')).hexdigest()[:16]
+    nombre = os.path.basename(os.path.normpath(folder_path))
+    return os.path.join(cache_dir, f"{nombre}-{digest}.arrow")
+
+
+def _abrir_cache(path, huella):
+    """Abre el archivo IPC con memory map si su huella coincide con la del origen"""
+    if not os.path.exists(path):
+        return None
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    metadata = reader.schema.metadata or {}
+    if metadata.get(HUELLA_KEY) != huella.encode('utf-8'):
+        return None
+    # read_all sobre un memory map no copia: las páginas se comparten entre procesos
+    return reader.read_all()
+
+
+def leer_tabla_cacheada(folder_path, columns=None, filters=None, cache_dir=CACHE_DIR):
+    """
+    Igual que leer_tabla, pero guarda el resultado una sola vez como Arrow IPC
+    sin compresión y en los siguientes arranques lo abre con memory map.
+    La entrada se reconstruye si cambia algún part file o el _SUCCESS.
+    """
+    huella = huella_origen(folder_path)
+    path = _ruta_cache(folder_path, columns, filters, cache_dir)
+
+    table = _abrir_cache(path, huella)
+    if table is not None:
+        return table
+
+    table = leer_tabla(folder_path, columns=columns, filters=filters)
+    if table is None:
+        return None
+
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        HUELLA_KEY: huella.encode('utf-8'),
+    })
+
+    # Escribir a un temporal y renombrar: otro worker nunca ve un archivo a medias.
+    # En Windows os.replace falla (PermissionError) si otra sesión tiene el
+    # archivo viejo en memory map: la página sigue con la tabla sin cachear y
+    # el próximo arranque vuelve a intentar la escritura.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return table
+
+    cacheada = _abrir_cache(path, huella)
+    return cacheada if cacheada is not None else table
+
+
+def load_dataset(folder_path, columns=None, filters=None, cache=True):
+    """
+    Carga una carpeta Parquet de Hive como DataFrame respaldado por Arrow.
+
+    columns: lista de columnas a leer (None = todas)
+    filters: expresión de pyarrow (p.ej. ds.field('year') > 0) o lista de
+             tuplas estilo pandas [('genre', '==', 'rock')]
+    cache:   usar la caché Arrow en disco (data/.cache)
+    """
+    if cache:
+        table = leer_tabla_cacheada(folder_path, columns=columns, filters=filters)
+    else:
+        table = leer_tabla(folder_path, columns=columns, filters=filters)
+    if table is None:
+        return None
+
+    # ArrowDtype evita convertir las columnas a objetos de Python
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
@@ -34,6 +34,13 @@ rem Job 10 - User Activity
 echo Descargando Job 10 (User Activity)...
 aws s3 sync s3://emr-logs-1758750407/music-data/mapreduce/job10_output/ data/job10_user_activity/ --profile dev --region us-east-1
 
+rem Job 5 - Mapeos y factores del modelo ALS (recomendaciones_service.py, als_topk.py)
+echo Descargando Job 5 (Mapeos ALS)...
+aws s3 sync s3://emr-logs-1758750407/music-data/models/als_model/user_mapping/ data/models/als_model/user_mapping/ --profile dev --region us-east-1
+aws s3 sync s3://emr-logs-1758750407/music-data/models/als_model/track_mapping/ data/models/als_model/track_mapping/ --profile dev --region us-east-1
+aws s3 sync s3://emr-logs-1758750407/music-data/models/als_model/user_factors/ data/models/als_model/user_factors/ --profile dev --region us-east-1
+aws s3 sync s3://emr-logs-1758750407/music-data/models/als_model/item_factors/ data/models/als_model/item_factors/ --profile dev --region us-east-1
+
 echo.
 echo ========================================
 echo Convirtiendo datos a JSON...
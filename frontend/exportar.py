@@ -0,0 +1,72 @@
+"""
+Exportación por lotes para los botones de descarga del dashboard.
+
+Los datos se escriben lote a lote con los writers de pyarrow, así la memoria
+máxima depende del tamaño de lote y no del tamaño de la tabla.
+"""
+import os
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from data_loader import CACHE_DIR, abrir_dataset
+
+# nombre visible -> (extensión, mime)
+FORMATOS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV comprimido (zstd)': ('csv.zst', 'application/zstd'),
+    'Parquet (zstd)': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+CHUNK_ROWS = 64 * 1024
+EXPORT_DIR = os.path.join(CACHE_DIR, 'exports')
+
+
+def formatos_para(schema):
+    """Formatos posibles para un esquema: las columnas anidadas solo van a Parquet"""
+    if any(pa.types.is_nested(field.type) for field in schema):
+        return ['Parquet (zstd)']
+    return list(FORMATOS)
+
+
+def lotes_carpeta(folder_path, columns=None, chunk_rows=CHUNK_ROWS):
+    """Recorre una carpeta Hive como lotes leídos directamente del disco"""
+    dataset = abrir_dataset(folder_path)
+    if dataset is None:
+        return None, iter(())
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    schema = dataset.schema if columns is None else pa.schema([dataset.schema.field(c) for c in columns])
+    return schema, dataset.to_batches(columns=columns, batch_size=chunk_rows)
+
+
+def lotes_seleccion(table, rows=None, chunk_rows=CHUNK_ROWS):
+    """Recorre las filas seleccionadas (posiciones) de una tabla Arrow en lotes"""
+    if rows is None:
+        return table.schema, table.to_batches(max_chunksize=chunk_rows)
+
+    def _lotes():
+        for inicio in range(0, len(rows), chunk_rows):
+            yield from table.take(rows[inicio:inicio + chunk_rows]).to_batches()
+
+    return table.schema, _lotes()
+
+
+def exportar(schema, batches, path, formato='CSV'):
+    """Escribe los lotes en path con el formato indicado (ver FORMATOS)"""
+    if formato == 'Parquet (zstd)':
+        with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+        return path
+
+    if formato == 'CSV comprimido (zstd)':
+        sink = pa.CompressedOutputStream(path, 'zstd')
+    else:
+        sink = pa.OSFile(path, 'wb')
+
+    with sink, pa_csv.CSVWriter(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    return path
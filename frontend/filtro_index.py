@@ -0,0 +1,85 @@
+"""
+Índice de filtros para music_with_stats (página "Datos Limpios").
+
+Se construye una vez por carpeta y resuelve cada consulta género/años/mínimo
+de reproducciones a un arreglo de posiciones de fila, sin copiar el DataFrame.
+"""
+import numpy as np
+import pandas as pd
+
+# Valor que nunca pasa un filtro (equivale a un NULL en la máscara original)
+_SIN_VALOR = np.iinfo(np.int64).min
+
+
+def _enteros(serie):
+    """Columna numérica como int64 de NumPy; los nulos quedan como _SIN_VALOR"""
+    return serie.to_numpy(dtype='int64', na_value=_SIN_VALOR)
+
+
+class IndiceFiltros:
+    """
+    - género: códigos categóricos + permutación ordenada por código, con el
+      rango [inicio, fin) de filas de cada género
+    - año y total_plays: permutación ordenada + columna ordenada para búsqueda binaria
+    """
+
+    def __init__(self, music_stats):
+        self.num_rows = len(music_stats)
+
+        generos = pd.Categorical(music_stats['genre'].astype(object))
+        self.genres = [str(g) for g in generos.categories]
+        codes = generos.codes
+        self._perm_genre = np.argsort(codes, kind='stable')
+        limites = np.searchsorted(codes[self._perm_genre], np.arange(len(self.genres) + 1))
+        self._rango_genre = {g: (limites[i], limites[i + 1]) for i, g in enumerate(self.genres)}
+        self._codes = codes
+        self._code_de = {g: i for i, g in enumerate(self.genres)}
+
+        self._year = _enteros(music_stats['year'])
+        self._perm_year = np.argsort(self._year, kind='stable')
+        self._year_sorted = self._year[self._perm_year]
+
+        self._plays = _enteros(music_stats['total_plays'])
+        self._perm_plays = np.argsort(self._plays, kind='stable')
+        self._plays_sorted = self._plays[self._perm_plays]
+
+        years_valid = self._year_sorted[self._year_sorted > 0]
+        self.year_min = int(years_valid[0]) if len(years_valid) else None
+        self.year_max = int(years_valid[-1]) if len(years_valid) else None
+
+    def filtrar(self, genre=None, year_range=None, min_plays=0):
+        """
+        Devuelve las posiciones (orden original) de las filas que cumplen:
+        genre == genre, year_range[0] <= year <= year_range[1] y total_plays >= min_plays.
+        """
+        candidatos = []
+
+        if genre is not None:
+            if genre not in self._rango_genre:
+                return np.empty(0, dtype=np.int64)
+            inicio, fin = self._rango_genre[genre]
+            candidatos.append(self._perm_genre[inicio:fin])
+
+        if year_range is not None:
+            lo = np.searchsorted(self._year_sorted, year_range[0], side='left')
+            hi = np.searchsorted(self._year_sorted, year_range[1], side='right')
+            candidatos.append(self._perm_year[lo:hi])
+
+        if min_plays:
+            lo = np.searchsorted(self._plays_sorted, min_plays, side='left')
+            candidatos.append(self._perm_plays[lo:])
+
+        if not candidatos:
+            return np.arange(self.num_rows)
+
+        # Partir del conjunto más pequeño y verificar el resto de condiciones solo sobre él
+        rows = min(candidatos, key=len)
+        if genre is not None:
+            rows = rows[self._codes[rows] == self._code_de[genre]]
+        if year_range is not None:
+            year = self._year[rows]
+            rows = rows[(year >= year_range[0]) & (year <= year_range[1])]
+        if min_plays:
+            rows = rows[self._plays[rows] >= min_plays]
+
+        return np.sort(rows)
@@ -0,0 +1,92 @@
+"""
+Lectura paginada de carpetas Parquet de Hive/Spark.
+
+Solo se decodifican los row groups que contienen las filas de la página pedida,
+así abrir una tabla cuesta O(página) y no O(tabla). El orden por columna usa
+permutaciones precalculadas guardadas en data/.cache.
+"""
+import hashlib
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from data_loader import CACHE_DIR, abrir_dataset, huella_origen, listar_partes
+
+
+class TablaPaginada:
+    """Índice global de filas -> (part file, row group) construido desde los footers"""
+
+    def __init__(self, folder_path, cache_dir=CACHE_DIR):
+        self.folder_path = folder_path
+        self.cache_dir = cache_dir
+        self._archivos = [pq.ParquetFile(f) for f in listar_partes(folder_path)]
+
+        rg_archivo, rg_indice, rg_filas = [], [], []
+        for i, pf in enumerate(self._archivos):
+            for j in range(pf.metadata.num_row_groups):
+                rg_archivo.append(i)
+                rg_indice.append(j)
+                rg_filas.append(pf.metadata.row_group(j).num_rows)
+
+        self._rg_archivo = np.array(rg_archivo, dtype=np.int64)
+        self._rg_indice = np.array(rg_indice, dtype=np.int64)
+        # _rg_inicio[k] = primera fila global del row group k
+        self._rg_inicio = np.concatenate([[0], np.cumsum(rg_filas, dtype=np.int64)])
+        self.num_rows = int(self._rg_inicio[-1])
+        self.schema = self._archivos[0].schema_arrow if self._archivos else pa.schema([])
+
+    def columnas_ordenables(self):
+        """Columnas primitivas (numéricas, texto, fechas) por las que se puede ordenar"""
+        return [f.name for f in self.schema if not pa.types.is_nested(f.type)]
+
+    def _leer_row_group(self, k, columns):
+        pf = self._archivos[self._rg_archivo[k]]
+        return pf.read_row_group(int(self._rg_indice[k]), columns=columns)
+
+    def leer_pagina(self, offset, limit, columns=None, orden=None):
+        """
+        Devuelve las filas [offset, offset + limit) como tabla Arrow.
+        orden: permutación global de filas (ver orden_por); None = orden original.
+        """
+        if orden is None:
+            ids = np.arange(offset, min(offset + limit, self.num_rows), dtype=np.int64)
+        else:
+            ids = np.asarray(orden[offset:offset + limit], dtype=np.int64)
+        if len(ids) == 0:
+            return self.schema.empty_table() if columns is None else self.schema.empty_table().select(columns)
+
+        rgs = np.searchsorted(self._rg_inicio, ids, side='right') - 1
+        partes, posiciones = [], np.empty(len(ids), dtype=np.int64)
+        leidas = 0
+        for k in np.unique(rgs):
+            en_rg = np.flatnonzero(rgs == k)
+            locales = ids[en_rg] - self._rg_inicio[k]
+            partes.append(self._leer_row_group(k, columns).take(locales))
+            posiciones[en_rg] = np.arange(leidas, leidas + len(en_rg))
+            leidas += len(en_rg)
+
+        # Volver a poner las filas en el orden pedido
+        return pa.concat_tables(partes).take(posiciones)
+
+    def orden_por(self, column, descending=False):
+        """Permutación global que ordena la tabla por column (memory map desde data/.cache)"""
+        clave = repr((os.path.abspath(self.folder_path), column, descending, huella_origen(self.folder_path)))
+        digest = hashlib.sha1(clave.encode('utf-8')).hexdigest()[:16]
+        path = os.path.join(self.cache_dir, f"orden-{digest}.npy")
+
+        if not os.path.exists(path):
+            valores = abrir_dataset(self.folder_path).to_table(columns=[column])
+            orden = pc.sort_indices(
+                valores,
+                sort_keys=[(column, 'descending' if descending else 'ascending')]
+            ).to_numpy().astype(np.int64)
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, orden)
+            os.replace(tmp_path, path)
+
+        return np.load(path, mmap_mode='r')
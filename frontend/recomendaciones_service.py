@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Consulta de recomendaciones por usuario sobre la salida del Job 5 (ALS).
+
+Construye un índice compacto user_idx -> (part file, row group, fila) sobre
+data/recommendations/user_recommendations y traduce los índices internos a
+user_id / track_id con los mapeos que guarda el Job 5 (models/als_model/).
+
+Uso como módulo:
+    servicio = ServicioRecomendaciones()
+    servicio.recomendar(user_id='b80344d0...', n=5)
+
+Uso como endpoint HTTP local:
+    python recomendaciones_service.py --port 8502
+    curl "http://localhost:8502/recommendations?user_id=...&n=5"
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from data_loader import CACHE_DIR, huella_origen, leer_tabla, listar_partes
+
+USER_RECS_DIR = os.path.join('data', 'recommendations', 'user_recommendations')
+MODEL_DIR = os.path.join('data', 'models', 'als_model')
+
+# Tope de n por consulta (el Job 5 guarda top-10 por usuario)
+MAX_RECOMENDACIONES = 100
+
+_INDICE_DTYPE = np.dtype([('user', np.int64), ('archivo', np.int32), ('row_group', np.int32), ('fila', np.int32)])
+
+
+def construir_indice(recs_dir=USER_RECS_DIR, cache_dir=CACHE_DIR):
+    """
+    Índice ordenado por user_idx (memory map desde data/.cache).
+    Solo lee la columna 'user' de cada row group.
+    """
+    clave = repr((os.path.abspath(recs_dir), huella_origen(recs_dir)))
+    digest = hashlib.sha1(clave.encode('utf-8')).hexdigest()[:16]
+    path = os.path.join(cache_dir, f"recs-index-{digest}.npy")
+    if os.path.exists(path):
+        return np.load(path, mmap_mode='r')
+
+    partes = []
+    for i, f in enumerate(listar_partes(recs_dir)):
+        pf = pq.ParquetFile(f)
+        for j in range(pf.metadata.num_row_groups):
+            users = pf.read_row_group(j, columns=['user']).column('user').to_numpy()
+            parte = np.empty(len(users), dtype=_INDICE_DTYPE)
+            parte['user'] = users
+            parte['archivo'] = i
+            parte['row_group'] = j
+            parte['fila'] = np.arange(len(users))
+            partes.append(parte)
+
+    indice = np.concatenate(partes) if partes else np.empty(0, dtype=_INDICE_DTYPE)
+    indice = indice[np.argsort(indice['user'], kind='stable')]
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(tmp_path, indice)
+    os.replace(tmp_path, path)
+    return np.load(path, mmap_mode='r')
+
+
+def _cargar_mapeo(folder_path, idx_col, id_col):
+    """Mapeo denso idx -> id (arreglo) y su inverso id -> idx (dict); None si no existe"""
+    table = leer_tabla(folder_path, columns=[idx_col, id_col])
+    if table is None:
+        return None, None
+    idx = table.column(idx_col).to_numpy()
+    ids = np.empty(int(idx.max()) + 1 if len(idx) else 0, dtype=object)
+    ids[idx] = table.column(id_col).to_numpy(zero_copy_only=False)
+    return ids, {v: int(i) for i, v in zip(idx, ids[idx])}
+
+
+class ServicioRecomendaciones:
+    """Top-N de un usuario sin cargar toda la tabla de recomendaciones"""
+
+    def __init__(self, recs_dir=USER_RECS_DIR, model_dir=MODEL_DIR, max_row_groups=64):
+        self._archivos = [pq.ParquetFile(f) for f in listar_partes(recs_dir)]
+        # Copias contiguas de cada campo: searchsorted sobre un campo con stride es más lento
+        indice = construir_indice(recs_dir)
+        self._users = np.ascontiguousarray(indice['user'])
+        self._archivo = np.ascontiguousarray(indice['archivo'])
+        self._rg = np.ascontiguousarray(indice['row_group'])
+        self._fila = np.ascontiguousarray(indice['fila'])
+        # El servidor es multihilo: el LRU se consulta y modifica con el lock tomado
+        self._row_groups = OrderedDict()
+        self._max_row_groups = max_row_groups
+        self._lock = threading.Lock()
+
+        self.user_ids, self._user_idx = _cargar_mapeo(os.path.join(model_dir, 'user_mapping'), 'user_idx', 'user_id')
+        self.track_ids, _ = _cargar_mapeo(os.path.join(model_dir, 'track_mapping'), 'track_idx', 'track_id')
+
+    @property
+    def num_usuarios(self):
+        return len(self._users)
+
+    def _row_group(self, archivo, row_group):
+        """Row group decodificado a arreglos NumPy (offsets, items, ratings), con LRU"""
+        clave = (archivo, row_group)
+        with self._lock:
+            if clave in self._row_groups:
+                self._row_groups.move_to_end(clave)
+                return self._row_groups[clave]
+
+        # Lectura fuera del lock: dos hilos pueden decodificar el mismo row group a la vez
+
+        recs = self._archivos[archivo].read_row_group(row_group, columns=['recommendations'])
+        lista = recs.column('recommendations').combine_chunks()
+        valores = lista.values
+        decodificado = (
+            lista.offsets.to_numpy(),
+            valores.field('item').to_numpy(zero_copy_only=False),
+            valores.field('rating').to_numpy(zero_copy_only=False),
+        )
+
+        with self._lock:
+            self._row_groups[clave] = decodificado
+            self._row_groups.move_to_end(clave)
+            while len(self._row_groups) > self._max_row_groups:
+                self._row_groups.popitem(last=False)
+        return decodificado
+
+    def user_idx_de(self, user_id):
+        """Traduce un user_id real al índice interno del modelo"""
+        if self._user_idx is None:
+            raise LookupError("Mapeo de usuarios no disponible (models/als_model/user_mapping)")
+        return self._user_idx.get(user_id)
+
+    def recomendar(self, user_id=None, user_idx=None, n=10):
+        """
+        Top-n del usuario como lista de dicts {track_idx, track_id, score}.
+        Devuelve None si el usuario no tiene recomendaciones.
+        """
+        if not 1 <= n <= MAX_RECOMENDACIONES:
+            raise ValueError(f"n debe estar entre 1 y {MAX_RECOMENDACIONES}")
+        if user_idx is None:
+            user_idx = self.user_idx_de(user_id)
+            if user_idx is None:
+                return None
+
+        pos = np.searchsorted(self._users, user_idx)
+        if pos >= len(self._users) or self._users[pos] != user_idx:
+            return None
+
+        offsets, items, ratings = self._row_group(int(self._archivo[pos]), int(self._rg[pos]))
+        fila = self._fila[pos]
+        inicio, fin = offsets[fila], offsets[fila + 1]
+        fin = min(fin, inicio + n)
+
+        recs = []
+        for item, score in zip(items[inicio:fin].tolist(), ratings[inicio:fin].tolist()):
+            track_id = None
+            if self.track_ids is not None and item < len(self.track_ids):
+                track_id = self.track_ids[item]
+            recs.append({'track_idx': item, 'track_id': track_id, 'score': score})
+        return recs
+
+
+def crear_handler(servicio):
+    """Handler HTTP: GET /recommendations?user_id=...|user_idx=...&n=10"""
+
+    class RecomendacionesHandler(BaseHTTPRequestHandler):
+        def _responder(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != '/recommendations':
+                self._responder(404, {'error': 'not found'})
+                return
+
+            params = parse_qs(url.query)
+            try:
+                n = int(params.get('n', ['10'])[0])
+                user_idx = int(params['user_idx'][0]) if 'user_idx' in params else None
+                user_id = params.get('user_id', [None])[0]
+                if user_idx is None and user_id is None:
+                    raise ValueError("user_id o user_idx es obligatorio")
+                recs = servicio.recomendar(user_id=user_id, user_idx=user_idx, n=n)
+            except (ValueError, LookupError) as e:
+                self._responder(400, {'error': str(e)})
+                return
+
+            if recs is None:
+                self._responder(404, {'error': 'usuario sin recomendaciones'})
+                return
+            self._responder(200, {'user_id': user_id, 'user_idx': user_idx, 'recommendations': recs})
+
+        def log_message(self, format, *args):
+            pass
+
+    return RecomendacionesHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio local de recomendaciones ALS")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--recs-dir', default=USER_RECS_DIR)
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    args = parser.parse_args()
+
+    servicio = ServicioRecomendaciones(args.recs_dir, args.model_dir)
+    print(f"[OK] Índice de {servicio.num_usuarios:,} usuarios")
+    if servicio.user_ids is None:
+        print(f"Mapeos no encontrados en {args.model_dir}: solo se aceptará user_idx")
+
+    server = ThreadingHTTPServer((args.host, args.port), crear_handler(servicio))
+    print(f"Sirviendo en http://{args.host}:{args.port}/recommendations")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
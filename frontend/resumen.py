@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Agregados precalculados para la página "Resumen General" del dashboard.
+
+Se ejecuta después de descargar la salida del Job 2 (data/cleaned/music_with_stats):
+    python resumen.py
+y deja tablas diminutas en data/summary/music_with_stats/ que la página lee directamente.
+"""
+import os
+import sys
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_loader import HUELLA_KEY, huella_origen, load_dataset
+
+MUSIC_STATS_DIR = os.path.join('data', 'cleaned', 'music_with_stats')
+SUMMARY_DIR = os.path.join('data', 'summary', 'music_with_stats')
+
+RESUMEN_COLUMNS = ['title', 'artist', 'genre', 'year', 'total_plays', 'unique_listeners', 'popularity_score']
+TABLAS = ['kpis', 'top_songs', 'genre_counts', 'decade_counts']
+
+
+def calcular_resumen(music_stats):
+    """Calcula los agregados de la página a partir de music_with_stats (sin modificarlo)"""
+    kpis = {
+        'total_songs': [len(music_stats)],
+        'total_plays': [int(music_stats['total_plays'].sum())],
+        'total_listeners': [int(music_stats['unique_listeners'].sum())],
+        'avg_popularity': [float(music_stats['popularity_score'].mean())],
+    }
+
+    top_songs = music_stats.nlargest(10, 'popularity_score')[
+        ['title', 'artist', 'total_plays', 'unique_listeners', 'popularity_score']
+    ]
+
+    genre_counts = music_stats['genre'].value_counts()
+
+    years = music_stats['year'][music_stats['year'] > 0]
+    decade_counts = ((years // 10) * 10).value_counts().sort_index()
+
+    return {
+        'kpis': pa.table(kpis),
+        'top_songs': pa.Table.from_pandas(top_songs, preserve_index=False),
+        'genre_counts': pa.table({
+            'genre': genre_counts.index.to_numpy(),
+            'count': genre_counts.to_numpy(dtype='int64'),
+        }),
+        'decade_counts': pa.table({
+            'decade': decade_counts.index.to_numpy(dtype='int64'),
+            'count': decade_counts.to_numpy(dtype='int64'),
+        }),
+    }
+
+
+def construir_resumen(src_dir=MUSIC_STATS_DIR, dst_dir=SUMMARY_DIR):
+    """Materializa los agregados como Parquet junto con la huella de la carpeta de origen"""
+    music_stats = load_dataset(src_dir, columns=RESUMEN_COLUMNS, cache=False)
+    if music_stats is None:
+        print(f"No parquet files found in {src_dir}")
+        return False
+
+    huella = huella_origen(src_dir).encode('utf-8')
+    os.makedirs(dst_dir, exist_ok=True)
+
+    for nombre, table in calcular_resumen(music_stats).items():
+        table = table.replace_schema_metadata({HUELLA_KEY: huella})
+        pq.write_table(table, os.path.join(dst_dir, f"{nombre}.parquet"))
+
+    print(f"[OK] {dst_dir} ({len(music_stats)} canciones)")
+    return True
+
+
+def cargar_resumen(src_dir=MUSIC_STATS_DIR, dst_dir=SUMMARY_DIR):
+    """
+    Lee los agregados precalculados. Devuelve None si faltan o si la carpeta
+    de origen cambió desde que se generaron (la página calcula en vivo).
+    """
+    huella = huella_origen(src_dir).encode('utf-8')
+    resumen = {}
+    for nombre in TABLAS:
+        path = os.path.join(dst_dir, f"{nombre}.parquet")
+        if not os.path.exists(path):
+            return None
+        table = pq.read_table(path)
+        if (table.schema.metadata or {}).get(HUELLA_KEY) != huella:
+            return None
+        resumen[nombre] = table
+    return resumen
+
+
+if __name__ == '__main__':
+    print("Building summary for Resumen General...")
+    sys.exit(0 if construir_resumen() else 1)
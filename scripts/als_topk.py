@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+MOTOR TOP-K SOBRE FACTORES ALS (NumPy, sin Spark)
+============================================================================
+Input: user_factors / item_factors exportados por el Job 5 (Parquet id, f0..fk)
+Output: top-K items por usuario (o lote de usuarios) en milisegundos
+============================================================================
+Uso:
+    python als_topk.py --model-dir data/models/als_model --users 10 42 --k 20
+============================================================================
+"""
+import argparse
+import os
+
+import numpy as np
+import pyarrow.dataset as ds
+
+
+def cargar_factores(folder_path, cache=True):
+    """
+    Carga una carpeta de factores (id, f0..f{rank-1}) como matriz float32 densa
+    indexada por id. Se guarda un .npy al lado para abrirlo con memory map.
+    """
+    npy_path = os.path.join(folder_path, '.factores.npy')
+    if cache and os.path.exists(npy_path):
+        # Se regenera si algún part file es más nuevo que el .npy
+        partes = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if not f.startswith('.')]
+        if all(os.path.getmtime(p) <= os.path.getmtime(npy_path) for p in partes):
+            return np.load(npy_path, mmap_mode='r')
+
+    table = ds.dataset(folder_path, format='parquet').to_table()
+    columnas = sorted((c for c in table.column_names if c.startswith('f')), key=lambda c: int(c[1:]))
+    ids = table.column('id').to_numpy()
+
+    matriz = np.zeros((int(ids.max()) + 1 if len(ids) else 0, len(columnas)), dtype=np.float32)
+    for j, c in enumerate(columnas):
+        matriz[ids, j] = table.column(c).to_numpy(zero_copy_only=False)
+
+    if cache:
+        # tmp + rename: otro proceso nunca abre un .npy a medio escribir
+        tmp_path = f"{npy_path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, matriz)
+        os.replace(tmp_path, npy_path)
+    return matriz
+
+
+def csr_desde_pares(user_idx, item_idx, num_users):
+    """(indptr, indices) con los items de cada usuario, a partir de pares (user, item)"""
+    user_idx = np.asarray(user_idx, dtype=np.int64)
+    item_idx = np.asarray(item_idx, dtype=np.int64)
+    orden = np.argsort(user_idx, kind='stable')
+    indptr = np.zeros(num_users + 1, dtype=np.int64)
+    np.cumsum(np.bincount(user_idx, minlength=num_users), out=indptr[1:])
+    return indptr, item_idx[orden]
+
+
+class MotorTopK:
+    """Top-K por producto matricial por bloques + argpartition"""
+
+    def __init__(self, user_factors, item_factors):
+        self.user_factors = np.asarray(user_factors, dtype=np.float32)
+        self.item_factors = np.ascontiguousarray(item_factors, dtype=np.float32)
+        self.num_items = self.item_factors.shape[0]
+
+    @classmethod
+    def desde_modelo(cls, model_dir):
+        """Carga model_dir/user_factors y model_dir/item_factors"""
+        return cls(
+            cargar_factores(os.path.join(model_dir, 'user_factors')),
+            cargar_factores(os.path.join(model_dir, 'item_factors')),
+        )
+
+    def puntuar(self, users):
+        """Scores de todos los items para los usuarios dados, shape (len(users), num_items)"""
+        return self.user_factors[np.asarray(users)] @ self.item_factors.T
+
+    def recomendar(self, users, k=10, excluir=None, items_validos=None, block_size=None):
+        """
+        Top-k para un lote de usuarios.
+
+        excluir: (indptr, indices) con los items ya escuchados por usuario
+                 (ver csr_desde_pares; también vale un scipy.sparse.csr_matrix)
+        items_validos: máscara booleana (num_items,) para filtrar el catálogo
+        block_size: usuarios por bloque (por defecto, bloques de ~32M scores)
+        Devuelve (items, scores), ambos de shape (len(users), k) ordenados por score.
+        """
+        users = np.atleast_1d(np.asarray(users, dtype=np.int64))
+        k = min(k, self.num_items)
+        if block_size is None:
+            block_size = max(1, min(1024, (1 << 25) // max(1, self.num_items)))
+        if excluir is not None and not isinstance(excluir, tuple):
+            excluir = (excluir.indptr, excluir.indices)
+
+        items_out = np.empty((len(users), k), dtype=np.int32)
+        scores_out = np.empty((len(users), k), dtype=np.float32)
+
+        for inicio in range(0, len(users), block_size):
+            bloque = users[inicio:inicio + block_size]
+            scores = self.puntuar(bloque)
+
+            if items_validos is not None:
+                scores[:, ~items_validos] = -np.inf
+            if excluir is not None:
+                indptr, indices = excluir
+                for fila, u in enumerate(bloque):
+                    scores[fila, indices[indptr[u]:indptr[u + 1]]] = -np.inf
+
+            # argpartition deja los k mayores (sin ordenar) en las primeras k columnas
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            orden = np.argsort(-top_scores, axis=1)
+
+            items_out[inicio:inicio + len(bloque)] = np.take_along_axis(top, orden, axis=1)
+            scores_out[inicio:inicio + len(bloque)] = np.take_along_axis(top_scores, orden, axis=1)
+
+        return items_out, scores_out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top-K ALS desde factores exportados por el Job 5")
+    parser.add_argument('--model-dir', required=True)
+    parser.add_argument('--users', type=int, nargs='+', required=True)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    motor = MotorTopK.desde_modelo(args.model_dir)
+    items, scores = motor.recomendar(args.users, k=args.k)
+    for u, fila_items, fila_scores in zip(args.users, items, scores):
+        recs = ', '.join(f"{i}:{s:.3f}" for i, s in zip(fila_items, fila_scores))
+        print(f"{u}\t{recs}")
+
+
+if __name__ == '__main__':
+    main()
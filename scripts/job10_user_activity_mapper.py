@@ -4,23 +4,40 @@
 JOB 10: ACTIVIDAD DE USUARIOS - MAPPER
 ============================================================================
 Input: TSV: user_id, track_id, playcount
-Output: user_id \t songs:1,plays:X
+Output: user_id \t songs,plays (sumado por usuario dentro de cada mapper)
+============================================================================
+Hadoop streaming:
+    -files streaming_runtime.py,job10_user_activity_mapper.py,job10_user_activity_reducer.py
+    -mapper job10_user_activity_mapper.py
+    -combiner "job10_user_activity_reducer.py --combiner"
+    -reducer job10_user_activity_reducer.py
 ============================================================================
 """
-import sys
+from streaming_runtime import Combinador, ejecutar, registros
+
 
-for line in sys.stdin:
-    line = line.strip()
-    if not line:
-        continue
+def procesar(salida, contadores):
+    combinador = Combinador(salida, lambda user_id, activity: b'%s\t%d,%d' % (user_id, *activity))
+    partial_activity = combinador.parciales
 
-    try:
-        fields = line.split('\t')
-        if len(fields) >= 3:
-            user_id = fields[0].strip()
+    for fields in registros(contadores, 3):
+        user_id = fields[0].strip()
+        try:
             playcount = int(fields[2])
+        except ValueError:
+            contadores.sumar('malformed_playcount')
+            continue
+
+        if user_id:
+            activity = partial_activity.get(user_id)
+            if activity is None:
+                combinador.agregar(user_id, [1, playcount])
+            else:
+                activity[0] += 1
+                activity[1] += playcount
+
+    combinador.vaciar()
+
 
-            if user_id:
-                print(f"{user_id}\t1,{playcount}")
-    except Exception:
-        continue
+if __name__ == '__main__':
+    ejecutar(procesar, 'job10_mapper')
@@ -5,56 +5,43 @@ JOB 10: ACTIVIDAD DE USUARIOS - REDUCER
 ============================================================================
 Input: user_id \t songs_count,plays (sorted by user_id)
 Output: user_id \t total_songs,total_plays,user_type
+Con --combiner emite user_id \t songs,plays (sumas parciales, mismo formato
+que la entrada) en vez de la clasificación.
 ============================================================================
 """
 import sys
 
-current_user = None
-total_songs = 0
-total_plays = 0
+from streaming_runtime import reducir, suma_vector
+
+COMBINER = '--combiner' in sys.argv[1:]
+
 
 def classify_user(songs, plays):
     """Classify user by activity level"""
     if songs < 5:
-        return "casual"
+        return b"casual"
     elif songs < 20:
-        return "regular"
+        return b"regular"
     elif songs < 50:
-        return "active"
+        return b"active"
     elif songs < 100:
-        return "heavy"
+        return b"heavy"
     else:
-        return "power_user"
-
-def output_user(user_id, songs, plays):
-    """Output user statistics"""
-    user_type = classify_user(songs, plays)
-    print(f"{user_id}\t{songs}\t{plays}\t{user_type}")
-
-for line in sys.stdin:
-    line = line.strip()
-    if not line:
-        continue
-
-    try:
-        user_id, values = line.split('\t')
-        song_count, playcount = values.split(',')
-
-        song_count = int(song_count)
-        playcount = int(playcount)
-
-        if current_user == user_id:
-            total_songs += song_count
-            total_plays += playcount
-        else:
-            if current_user:
-                output_user(current_user, total_songs, total_plays)
-            current_user = user_id
-            total_songs = song_count
-            total_plays = playcount
-    except Exception:
-        continue
-
-# Don't forget last user
-if current_user:
-    output_user(current_user, total_songs, total_plays)
+        return b"power_user"
+
+
+def emitir_sumas(salida, user_id, totales):
+    salida.escribir(b'%s\t%d,%d' % (user_id, *totales))
+
+
+def emitir_usuario(salida, user_id, totales):
+    songs, plays = totales
+    salida.escribir(b'%s\t%d\t%d\t%s' % (user_id, songs, plays, classify_user(songs, plays)))
+
+
+if __name__ == '__main__':
+    reducir(
+        'job10_combiner' if COMBINER else 'job10_reducer',
+        suma_vector((int, int)),
+        emitir_sumas if COMBINER else emitir_usuario
+    )
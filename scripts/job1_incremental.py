@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+JOB 1 (INCREMENTAL): INGESTA CSV -> PARQUET SOLO DE ARCHIVOS NUEVOS
+============================================================================
+Objetivo: Refrescos diarios del log de escuchas en O(datos nuevos) en vez
+          de reconvertir todos los CSV como job1_ingesta.hql
+Input: raw-csv/{music,listening}/ (local o directamente en s3://.../music-data/)
+Output: raw-parquet/{music,listening}/dt=YYYY-MM-DD/<csv>.snappy.parquet
+        + raw-parquet/_ingest_manifest.json (ruta, tamaño, checksum y
+        destino de cada CSV ya convertido)
+============================================================================
+Cada CSV nuevo se convierte en un part file de la partición del día
+(--dt). Un CSV ya registrado cuyo tamaño o checksum cambió se reconvierte
+sobre su part file original, así que su partición vuelve a quedar
+"afectada". El md5 solo se recalcula si cambian tamaño o mtime.
+Al final se imprimen las particiones afectadas y el comando del
+job2_incremental.hql que las procesa (merge en listening_clean,
+track_stats y music_clean).
+
+Los CSV de la carga completa (job1_ingesta.hql) se registran sin
+convertir con --marcar-convertidos. Si después cambia alguno, hay que
+volver a correr los jobs 1 y 2 completos.
+
+Uso:
+    python job1_incremental.py --csv-dir data/raw-csv --output-dir data/raw-parquet --marcar-convertidos
+    python job1_incremental.py --csv-dir data/raw-csv --output-dir data/raw-parquet
+    python job1_incremental.py --csv-dir data/raw-csv --output-dir data/raw-parquet --dt 2026-10-18
+    python job1_incremental.py --csv-dir s3://emr-logs-1758750407/music-data/raw-csv \
+        --output-dir s3://emr-logs-1758750407/music-data/raw-parquet
+============================================================================
+"""
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+MANIFEST = '_ingest_manifest.json'
+
+# Columnas de los CSV en orden (como music_csv_temp / listening_csv_temp),
+# esquema Parquet de destino (como music_raw / listening_raw) y columna del
+# CSV de cada campo que cambia de nombre
+TABLAS = {
+    'music': {
+        'csv': ['track_id', 'name', 'artist', 'spotify_preview_url', 'spotify_id', 'tags', 'genre',
+                'year', 'duration_ms', 'danceability', 'energy', 'key_val', 'loudness', 'mode',
+                'speechiness', 'acousticness', 'instrumentalness', 'liveness', 'valence', 'tempo',
+                'time_signature'],
+        'schema': pa.schema([
+            ('track_id', pa.string()), ('title', pa.string()), ('artist', pa.string()),
+            ('spotify_preview_url', pa.string()), ('spotify_id', pa.string()), ('tags', pa.string()),
+            ('genre', pa.string()), ('year', pa.int32()), ('duration_ms', pa.int64()),
+            ('danceability', pa.float64()), ('energy', pa.float64()), ('key_signature', pa.int32()),
+            ('loudness', pa.float64()), ('mode', pa.int32()), ('speechiness', pa.float64()),
+            ('acousticness', pa.float64()), ('instrumentalness', pa.float64()),
+            ('liveness', pa.float64()), ('valence', pa.float64()), ('tempo', pa.float64()),
+            ('time_signature', pa.int32()),
+        ]),
+        'renombres': {'title': 'name', 'key_signature': 'key_val'},
+        'obligatorias': ['track_id'],
+    },
+    'listening': {
+        'csv': ['track_id', 'user_id', 'playcount'],
+        'schema': pa.schema([
+            ('user_id', pa.string()), ('track_id', pa.string()), ('playcount', pa.int32()),
+        ]),
+        'renombres': {},
+        'obligatorias': ['track_id', 'user_id', 'playcount'],
+    },
+}
+
+CHUNK_SIZE = 1 << 20
+
+
+# ============================================================================
+# SISTEMA DE ARCHIVOS (LOCAL O S3)
+# ============================================================================
+
+def abrir_fs(uri):
+    """Ruta local o s3://bucket/... -> (filesystem de pyarrow, ruta base)"""
+    if '://' not in uri:
+        return pafs.LocalFileSystem(), os.path.abspath(uri)
+    filesystem, base = pafs.FileSystem.from_uri(uri)
+    return filesystem, base.rstrip('/')
+
+
+def escribir_atomico(filesystem, path, escribir):
+    """
+    escribir(ruta) deja el archivo completo en path: en local se escribe un
+    .tmp y se renombra (los lectores nunca ven uno a medio escribir); en S3
+    el objeto aparece recién cuando termina el upload
+    """
+    if not isinstance(filesystem, pafs.LocalFileSystem):
+        escribir(path)
+        return
+    carpeta, nombre = posixpath.split(path)
+    filesystem.create_dir(carpeta, recursive=True)
+    tmp_path = posixpath.join(carpeta, f".{nombre}.tmp")
+    escribir(tmp_path)
+    filesystem.move(tmp_path, path)
+
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+def cargar_manifest(filesystem, output_dir):
+    """{ruta relativa del CSV: {size, mtime, md5, dt, output, rows}}"""
+    path = posixpath.join(output_dir, MANIFEST)
+    if filesystem.get_file_info(path).type == pafs.FileType.NotFound:
+        return {}
+    with filesystem.open_input_stream(path) as f:
+        return json.loads(f.read().decode('utf-8'))
+
+
+def guardar_manifest(filesystem, output_dir, manifest):
+    contenido = json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')
+
+    def escribir(path):
+        with filesystem.open_output_stream(path) as f:
+            f.write(contenido)
+
+    escribir_atomico(filesystem, posixpath.join(output_dir, MANIFEST), escribir)
+
+
+def md5_archivo(filesystem, path):
+    digest = hashlib.md5()
+    with filesystem.open_input_stream(path) as f:
+        for bloque in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def listar_csv(filesystem, csv_dir, tabla):
+    """{ruta relativa (tabla/...): FileInfo} de los CSV de una tabla, sin ocultos"""
+    selector = pafs.FileSelector(posixpath.join(csv_dir, tabla), recursive=True, allow_not_found=True)
+    archivos = {}
+    for info in filesystem.get_file_info(selector):
+        ruta = info.path[len(csv_dir):].lstrip('/')
+        if info.type != pafs.FileType.File or info.base_name.endswith('$folder$'):
+            continue
+        if any(parte.startswith(('.', '_')) for parte in ruta.split('/')):
+            continue
+        archivos[ruta] = info
+    return dict(sorted(archivos.items()))
+
+
+def clasificar(filesystem, csv_dir, tabla, manifest):
+    """
+    (nuevos, modificados, stat por ruta): los modificados son los del
+    manifest cuyo tamaño/checksum cambió (el md5 solo si cambió tamaño o mtime)
+    """
+    nuevos, modificados, stats = [], [], {}
+    for ruta, info in listar_csv(filesystem, csv_dir, tabla).items():
+        size, mtime = info.size, info.mtime.timestamp()
+        stats[ruta] = {'size': size, 'mtime': mtime}
+        previo = manifest.get(ruta)
+        if previo is None:
+            nuevos.append(ruta)
+        elif previo['size'] != size or previo['mtime'] != mtime:
+            stats[ruta]['md5'] = md5_archivo(filesystem, posixpath.join(csv_dir, ruta))
+            if previo['size'] != size or previo['md5'] != stats[ruta]['md5']:
+                modificados.append(ruta)
+            else:
+                previo['mtime'] = mtime  # mismo contenido (touch/copia)
+    return nuevos, modificados, stats
+
+
+# ============================================================================
+# CONVERSIÓN
+# ============================================================================
+
+def castear(columna, tipo):
+    """CAST de Hive: los valores que no convierten quedan en NULL"""
+    try:
+        return pc.cast(columna, tipo)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        convertir = int if pa.types.is_integer(tipo) else float
+        valores = []
+        for v in columna.to_pylist():
+            try:
+                valores.append(None if v is None else convertir(v.strip()))
+            except ValueError:
+                valores.append(None)
+        return pa.array(valores, type=tipo)
+
+
+def convertir_csv(filesystem, path, tabla):
+    """CSV -> tabla con el esquema de music_raw/listening_raw (mismos filtros que el Job 1)"""
+    spec = TABLAS[tabla]
+    table = pv.read_csv(
+        filesystem.open_input_stream(path),
+        read_options=pv.ReadOptions(column_names=spec['csv'], skip_rows=1),
+        convert_options=pv.ConvertOptions(
+            column_types={c: pa.string() for c in spec['csv']},
+            strings_can_be_null=False
+        )
+    )
+    # Por nombre, como el INSERT ... SELECT del Job 1 (name AS title, key_val AS key_signature)
+    columnas = []
+    for campo in spec['schema']:
+        columna = table.column(spec['renombres'].get(campo.name, campo.name))
+        columnas.append(columna if campo.type == pa.string() else castear(columna, campo.type))
+    table = pa.Table.from_arrays(columnas, schema=spec['schema'])
+
+    ok = pc.not_equal(table.column('track_id'), 'track_id')
+    for c in spec['obligatorias']:
+        ok = pc.and_(ok, table.column(c).is_valid())
+    if tabla == 'listening':
+        ok = pc.and_(ok, pc.not_equal(table.column('user_id'), 'user_id'))
+    return table.filter(ok.fill_null(False))
+
+
+def escribir_parte(filesystem, table, path):
+    """Part file atómico (los lectores nunca ven uno a medio escribir)"""
+    escribir_atomico(
+        filesystem, path,
+        lambda destino: pq.write_table(table, destino, filesystem=filesystem, compression='snappy')
+    )
+
+
+def nombre_parte(ruta):
+    """listening/2026/10/18.csv -> 2026__10__18.snappy.parquet (estable por CSV)"""
+    relativa = posixpath.splitext(ruta.split('/', 1)[1])[0]
+    return relativa.replace('/', '__') + '.snappy.parquet'
+
+
+def lista_hive(particiones):
+    """['2026-10-18'] -> "'2026-10-18'" para --hivevar (vacía -> "''", no matchea nada)"""
+    return ','.join(f"'{p}'" for p in sorted(particiones)) or "''"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job 1 incremental: solo CSV nuevos a particiones dt=")
+    parser.add_argument('--csv-dir', required=True, help="Raíz con music/ y listening/ (raw-csv), local o s3://")
+    parser.add_argument('--output-dir', required=True, help="Raíz raw-parquet, local o s3://")
+    parser.add_argument('--dt', default=time.strftime('%Y-%m-%d'), help="Partición de los CSV nuevos")
+    parser.add_argument('--marcar-convertidos', action='store_true',
+                        help="Registrar los CSV actuales como convertidos por job1_ingesta.hql")
+    args = parser.parse_args()
+
+    fs_csv, csv_dir = abrir_fs(args.csv_dir)
+    fs_out, output_dir = abrir_fs(args.output_dir)
+    manifest = cargar_manifest(fs_out, output_dir)
+
+    if args.marcar_convertidos:
+        registrados = 0
+        for tabla in TABLAS:
+            for ruta, info in listar_csv(fs_csv, csv_dir, tabla).items():
+                if ruta in manifest:
+                    continue
+                md5 = md5_archivo(fs_csv, posixpath.join(csv_dir, ruta))
+                manifest[ruta] = {'size': info.size, 'mtime': info.mtime.timestamp(), 'md5': md5,
+                                  'dt': None, 'output': None, 'rows': None}
+                registrados += 1
+        guardar_manifest(fs_out, output_dir, manifest)
+        print(f"[OK] {registrados} CSV registrados como carga completa")
+        return
+
+    print("=" * 80)
+    print(f"INICIANDO JOB 1 (INCREMENTAL): dt={args.dt}")
+    print("=" * 80)
+
+    inicio = time.time()
+    afectadas = {tabla: set() for tabla in TABLAS}
+    for tabla in TABLAS:
+        nuevos, modificados, stats = clasificar(fs_csv, csv_dir, tabla, manifest)
+        print(f"\n📂 {tabla}: {len(nuevos)} CSV nuevos, {len(modificados)} modificados")
+
+        for ruta in modificados:
+            if manifest[ruta]['output'] is None:
+                raise SystemExit(f"❌ {ruta} es de la carga completa y cambió: correr los jobs 1 y 2 completos")
+
+        for ruta in nuevos + modificados:
+            previo = manifest.get(ruta)
+            dt = previo['dt'] if previo else args.dt
+            output = previo['output'] if previo else posixpath.join(tabla, f"dt={dt}", nombre_parte(ruta))
+
+            path = posixpath.join(csv_dir, ruta)
+            table = convertir_csv(fs_csv, path, tabla)
+            escribir_parte(fs_out, table, posixpath.join(output_dir, output))
+
+            manifest[ruta] = {
+                'size': stats[ruta]['size'], 'mtime': stats[ruta]['mtime'],
+                'md5': stats[ruta].get('md5') or md5_archivo(fs_csv, path),
+                'dt': dt, 'output': output, 'rows': table.num_rows,
+            }
+            # Después de cada archivo: si se corta, lo ya escrito queda registrado
+            guardar_manifest(fs_out, output_dir, manifest)
+            afectadas[tabla].add(dt)
+            print(f"   ✓ {ruta} -> {output} ({table.num_rows:,} filas)")
+
+    guardar_manifest(fs_out, output_dir, manifest)
+
+    print(f"\n✓ Conversión en {time.time() - inicio:.1f}s")
+    if not any(afectadas.values()):
+        print("✓ Sin CSV nuevos ni modificados")
+        return
+
+    hivevars = (f"--hivevar dts_music=\"{lista_hive(afectadas['music'])}\" "
+                f"--hivevar dts_listening=\"{lista_hive(afectadas['listening'])}\"")
+    print("\n📋 Particiones afectadas:")
+    for tabla, particiones in afectadas.items():
+        print(f"   {tabla}: {', '.join(sorted(particiones)) or '-'}")
+    print("\nSiguiente paso (merge de las particiones afectadas):")
+    print(f"   hive -f job2_incremental.hql {hivevars}")
+    print(f"   python pipeline_local.py --data-dir <data> --jobs 2i {hivevars}")
+
+    print("\n" + "=" * 80)
+    print("JOB 1 INCREMENTAL COMPLETADO")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+JOB 5 (MODO LOCAL): ALS IMPLÍCITO EN UN SOLO NODO (NumPy/SciPy)
+============================================================================
+Objetivo: Entrenar el recomendador sin cluster EMR
+Input: listening_clean (Parquet local o s3://)
+Output: las mismas salidas que job5_recomendador_als.py:
+        metrics/model_evaluation (RMSE/MAE + métricas de ranking), recommendations/{user,item}_recommendations,
+        recommendations/user_recs_exploded, models/als_model/{user,track}_mapping
+        y models/als_model/{user,item}_factors
+============================================================================
+Feedback implícito (Hu, Koren & Volinsky): preferencia p_ui = 1 si el usuario
+escuchó la canción y confianza c_ui = 1 + alpha * total_playcount. Cada
+semipaso resuelve los factores con unos pocos pasos de gradiente conjugado
+(warm start), por bloques de usuarios/items en paralelo.
+
+Uso:
+    python job5_als_local.py --input data/cleaned/listening --output-dir ../frontend/data
+============================================================================
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import scipy.sparse as sp
+
+from als_topk import MotorTopK, csr_desde_pares
+from metricas_ranking import metricas_ranking
+from tablas_parquet import escribir_parte, escribir_tabla
+
+
+# ============================================================================
+# CARGA E INDEXACIÓN
+# ============================================================================
+
+def cargar_interacciones(input_path):
+    """Lee user_id, track_id y total_playcount de listening_clean"""
+    table = ds.dataset(input_path, format='parquet').to_table(
+        columns=['user_id', 'track_id', 'total_playcount']
+    )
+    return table
+
+
+def indexar(table, model_dir=None):
+    """
+    Codifica user_id/track_id como enteros con dictionary_encode (una sola
+    pasada, sin ordenar strings). Con model_dir cada etiqueta se traduce a su
+    índice en los diccionarios append-only del modelo (asignar_ids).
+    Devuelve los idx, los ratings y el tamaño de cada espacio de índices.
+    """
+    users = pc.dictionary_encode(table.column('user_id')).combine_chunks()
+    tracks = pc.dictionary_encode(table.column('track_id')).combine_chunks()
+    ratings = table.column('total_playcount').to_numpy().astype(np.float32)
+    user_idx = users.indices.to_numpy().astype(np.int64)
+    track_idx = tracks.indices.to_numpy().astype(np.int64)
+    if model_dir is None:
+        return user_idx, track_idx, ratings, len(users.dictionary), len(tracks.dictionary)
+
+    por_user, _ = asignar_ids(os.path.join(model_dir, 'user_mapping'), 'user_idx', 'user_id', users.dictionary)
+    por_track, _ = asignar_ids(os.path.join(model_dir, 'track_mapping'), 'track_idx', 'track_id', tracks.dictionary)
+    return (
+        por_user[user_idx],
+        por_track[track_idx],
+        ratings,
+        int(por_user.max()) + 1 if len(por_user) else 0,
+        int(por_track.max()) + 1 if len(por_track) else 0,
+    )
+
+
+def asignar_ids(mapping_dir, idx_col, id_col, ids):
+    """
+    Índice de cada id en el diccionario de mapping_dir; los ids desconocidos
+    reciben índices nuevos a partir del máximo y se agregan como un part file
+    más (append-only, igual que asignar_ids del Job 5 en Spark: nunca se
+    reescriben índices ya publicados). Devuelve (idx, cantidad de altas).
+    Los índices se guardan como long, el mismo esquema que escribe Spark, para
+    que los part files de una y otra versión convivan en la carpeta.
+    """
+    esquema = pa.schema([(idx_col, pa.int64()), (id_col, pa.string())])
+    if os.path.isdir(mapping_dir) and any(f.startswith('part-') for f in os.listdir(mapping_dir)):
+        mapeo = ds.dataset(mapping_dir, format='parquet', schema=esquema).to_table()
+    else:
+        mapeo = esquema.empty_table()
+    pos = pc.index_in(ids, value_set=mapeo.column(id_col))
+    conocidos = pos.is_valid().to_numpy(zero_copy_only=False)
+    idx = np.full(len(ids), -1, dtype=np.int64)
+    idx[conocidos] = mapeo.column(idx_col).to_numpy()[pos.drop_null().to_numpy().astype(np.int64)]
+
+    nuevos = np.flatnonzero(~conocidos)
+    if len(nuevos):
+        siguiente = int(pc.max(mapeo.column(idx_col)).as_py()) + 1 if mapeo.num_rows else 0
+        idx[nuevos] = np.arange(siguiente, siguiente + len(nuevos))
+        altas = pa.table({
+            idx_col: pa.array(idx[nuevos]),
+            id_col: pa.array(ids).take(pa.array(nuevos)),
+        }).cast(esquema)
+        nombre = f"part-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}.snappy.parquet"
+        escribir_parte(altas, os.path.join(mapping_dir, nombre))
+        open(os.path.join(mapping_dir, '_SUCCESS'), 'w').close()
+    return idx, len(nuevos)
+
+
+def filtrar_min_interacciones(users, items, ratings, min_user, min_item):
+    """Igual que en Spark: usuarios e items con al menos N interacciones (una pasada)"""
+    user_ok = np.bincount(users)[users] >= min_user
+    item_ok = np.bincount(items)[items] >= min_item
+    mask = user_ok & item_ok
+    return users[mask], items[mask], ratings[mask]
+
+
+def dividir_train_test(n, test_fraction=0.2, seed=42):
+    """Máscara booleana de train (True) / test (False)"""
+    rng = np.random.default_rng(seed)
+    return rng.random(n) >= test_fraction
+
+
+def matriz_confianza(users, items, ratings, num_users, num_items, alpha):
+    """CSR usuarios x items con data = alpha * playcount (c_ui - 1)"""
+    return sp.csr_matrix(
+        (alpha * ratings.astype(np.float32), (users, items)),
+        shape=(num_users, num_items),
+        dtype=np.float32,
+    )
+
+
+# ============================================================================
+# ALS IMPLÍCITO CON GRADIENTE CONJUGADO
+# ============================================================================
+
+def _cg_bloque(Cm1, X, Y, G, cg_steps):
+    """
+    Unos pasos de CG para las filas de X (bloque) resolviendo
+    (G + Y^T (C_u - I) Y) x_u = Y^T C_u p_u   con G = Y^T Y + reg * I
+    Cm1: CSR del bloque con data = c_ui - 1
+    """
+    filas = np.repeat(np.arange(Cm1.shape[0]), np.diff(Cm1.indptr))
+    cols = Cm1.indices
+    Yc = Y[cols]
+
+    def A(P):
+        dots = np.einsum('ij,ij->i', P[filas], Yc)
+        W = sp.csr_matrix((Cm1.data * dots, cols, Cm1.indptr), shape=Cm1.shape)
+        return P @ G + W @ Y
+
+    # b = sum_i c_ui y_i  (p_ui = 1 en las interacciones observadas)
+    Cp = sp.csr_matrix((Cm1.data + 1.0, cols, Cm1.indptr), shape=Cm1.shape)
+    b = np.asarray(Cp @ Y)
+
+    r = b - A(X)
+    p = r.copy()
+    rs = np.einsum('ij,ij->i', r, r)
+    for _ in range(cg_steps):
+        Ap = A(p)
+        pAp = np.einsum('ij,ij->i', p, Ap)
+        paso = np.divide(rs, pAp, out=np.zeros_like(rs), where=pAp > 1e-20)
+        X += paso[:, None] * p
+        r -= paso[:, None] * Ap
+        rs_nuevo = np.einsum('ij,ij->i', r, r)
+        beta = np.divide(rs_nuevo, rs, out=np.zeros_like(rs), where=rs > 1e-20)
+        p = r + beta[:, None] * p
+        rs = rs_nuevo
+    return X
+
+
+def resolver_factores(Cm1, X, Y, reg, cg_steps=3, threads=None, nnz_por_bloque=500_000):
+    """
+    Semipaso ALS: actualiza X (in place) con Y fijo. Las filas se reparten en
+    bloques de ~nnz_por_bloque interacciones resueltos en paralelo con hilos
+    (NumPy/SciPy liberan el GIL en las operaciones grandes).
+    """
+    G = Y.T @ Y + reg * np.eye(Y.shape[1], dtype=np.float32)
+
+    cortes = [0]
+    objetivo = nnz_por_bloque
+    nnz_acumulado = Cm1.indptr
+    while cortes[-1] < Cm1.shape[0]:
+        siguiente = int(np.searchsorted(nnz_acumulado, nnz_acumulado[cortes[-1]] + objetivo, side='right'))
+        cortes.append(min(max(siguiente, cortes[-1] + 1), Cm1.shape[0]))
+
+    def tarea(a, b):
+        X[a:b] = _cg_bloque(Cm1[a:b], X[a:b].copy(), Y, G, cg_steps)
+
+    with ThreadPoolExecutor(max_workers=threads or os.cpu_count()) as pool:
+        list(pool.map(lambda ab: tarea(*ab), zip(cortes[:-1], cortes[1:])))
+    return X
+
+
+class ALSImplicito:
+    """ALS para feedback implícito (playcounts) entrenado con CG"""
+
+    def __init__(self, rank=10, reg=0.1, alpha=40.0, iterations=10, cg_steps=3, threads=None, seed=42):
+        self.rank = rank
+        self.reg = reg
+        self.alpha = alpha
+        self.iterations = iterations
+        self.cg_steps = cg_steps
+        self.threads = threads
+        self.seed = seed
+        self.user_factors = None
+        self.item_factors = None
+
+    def inicializar(self, num_users, num_items):
+        rng = np.random.default_rng(self.seed)
+        escala = 0.01
+        self.user_factors = (rng.standard_normal((num_users, self.rank)) * escala).astype(np.float32)
+        self.item_factors = (rng.standard_normal((num_items, self.rank)) * escala).astype(np.float32)
+
+    def iterar(self, Cui, CuiT):
+        """Una iteración ALS completa (usuarios y luego items)"""
+        resolver_factores(Cui, self.user_factors, self.item_factors, self.reg, self.cg_steps, self.threads)
+        resolver_factores(CuiT, self.item_factors, self.user_factors, self.reg, self.cg_steps, self.threads)
+
+    def fit(self, Cui, callback=None):
+        """
+        Cui: CSR usuarios x items con data = alpha * playcount.
+        callback(iteracion, modelo) se llama después de cada iteración; si
+        devuelve True el entrenamiento se corta (poda temprana).
+        """
+        Cui = Cui.tocsr()
+        CuiT = Cui.T.tocsr()
+        if self.user_factors is None:
+            self.inicializar(*Cui.shape)
+
+        for it in range(self.iterations):
+            self.iterar(Cui, CuiT)
+            if callback is not None and callback(it + 1, self):
+                break
+        return self
+
+    def predecir(self, users, items):
+        """Preferencia estimada para pares (user, item)"""
+        return np.einsum('ij,ij->i', self.user_factors[users], self.item_factors[items])
+
+
+# ============================================================================
+# ESCRITURA DE SALIDAS (mismo layout que el Job 5 en Spark)
+# ============================================================================
+
+def tabla_recomendaciones(ids, top_items, top_scores, id_col, item_col):
+    """(id, recommendations: list<struct<item_col, rating>>) como recommendForAll*"""
+    n, k = top_items.shape
+    recs = pa.StructArray.from_arrays(
+        [pa.array(top_items.ravel(), type=pa.int32()), pa.array(top_scores.ravel(), type=pa.float32())],
+        names=[item_col, 'rating'],
+    )
+    offsets = pa.array(np.arange(0, n * k + 1, k, dtype=np.int32))
+    return pa.table({
+        id_col: pa.array(ids, type=pa.int32()),
+        'recommendations': pa.ListArray.from_arrays(offsets, recs),
+    })
+
+
+def tabla_factores(factores, ids):
+    """(id, f0..f{rank-1}) como lo exporta el Job 5"""
+    columnas = {'id': pa.array(ids, type=pa.int32())}
+    for j in range(factores.shape[1]):
+        columnas[f"f{j}"] = pa.array(factores[ids, j], type=pa.float32())
+    return pa.table(columnas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job 5 en modo local: ALS implícito con CG")
+    parser.add_argument('--input', required=True, help="Carpeta Parquet de listening_clean")
+    parser.add_argument('--output-dir', required=True, help="Raíz de salida (p.ej. ../frontend/data)")
+    parser.add_argument('--rank', type=int, default=10)
+    parser.add_argument('--reg', type=float, default=0.1)
+    parser.add_argument('--alpha', type=float, default=40.0)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--cg-steps', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--min-interactions', type=int, default=5)
+    args = parser.parse_args()
+
+    OUTPUT_MODEL = os.path.join(args.output_dir, 'models', 'als_model')
+    OUTPUT_RECOMMENDATIONS = os.path.join(args.output_dir, 'recommendations')
+    OUTPUT_METRICS = os.path.join(args.output_dir, 'metrics')
+
+    print("=" * 80)
+    print("INICIANDO JOB 5 (LOCAL): ALS IMPLÍCITO")
+    print("=" * 80)
+
+    # PASO 1-2: carga, indexación y filtros de calidad
+    inicio = time.time()
+    table = cargar_interacciones(args.input)
+    print(f"\n✓ Datos cargados: {table.num_rows:,} registros")
+
+    users, items, ratings, num_users, num_items = indexar(table, OUTPUT_MODEL)
+    users, items, ratings = filtrar_min_interacciones(
+        users, items, ratings, args.min_interactions, args.min_interactions
+    )
+    print(f"✓ Después de filtrado: {len(users):,} registros")
+    print(f"   Usuarios únicos: {len(np.unique(users)):,}")
+    print(f"   Canciones únicas: {len(np.unique(items)):,}")
+
+    # PASO 3: train/test
+    train = dividir_train_test(len(users))
+    print(f"\n📊 Training: {train.sum():,} | Test: {(~train).sum():,}")
+
+    # PASO 4: entrenamiento
+    Cui = matriz_confianza(users[train], items[train], ratings[train], num_users, num_items, args.alpha)
+    modelo = ALSImplicito(
+        rank=args.rank, reg=args.reg, alpha=args.alpha,
+        iterations=args.iterations, cg_steps=args.cg_steps, threads=args.threads
+    )
+    def progreso(it, _modelo):
+        print(f"   iteración {it}/{args.iterations}")
+        return False
+
+    print("\n🚀 Entrenando modelo ALS implícito...")
+    modelo.fit(Cui, callback=progreso)
+    print(f"✓ Modelo entrenado en {time.time() - inicio:.1f}s")
+
+    # PASO 5: evaluación (preferencia estimada vs p_ui = 1 en las interacciones de test)
+    pred = modelo.predecir(users[~train], items[~train])
+    rmse = float(np.sqrt(np.mean((pred - 1.0) ** 2))) if len(pred) else float('nan')
+    mae = float(np.mean(np.abs(pred - 1.0))) if len(pred) else float('nan')
+    print(f"\n📈 RMSE (preferencia implícita): {rmse:.4f}")
+    print(f"📈 MAE (preferencia implícita): {mae:.4f}")
+    metricas = {'RMSE_implicit': rmse, 'MAE_implicit': mae}
+
+    # PASO 6: recomendaciones (usuarios/items con al menos una interacción de train)
+    users_activos = np.flatnonzero(np.diff(Cui.indptr) > 0)
+    items_activos = np.flatnonzero(np.bincount(Cui.indices, minlength=num_items) > 0)
+
+    # Sin los items de train de cada usuario (como job5_tuning_local): Cui solo
+    # tiene items activos, se pasan a posiciones dentro de items_activos
+    posicion = np.full(num_items, -1, dtype=np.int64)
+    posicion[items_activos] = np.arange(len(items_activos))
+    motor = MotorTopK(modelo.user_factors, modelo.item_factors[items_activos])
+    top_items, top_scores = motor.recomendar(
+        users_activos, k=args.top_k, excluir=(Cui.indptr, posicion[Cui.indices])
+    )
+    top_items = items_activos[top_items]
+    escribir_tabla(
+        tabla_recomendaciones(users_activos, top_items, top_scores, 'user', 'item'),
+        os.path.join(OUTPUT_RECOMMENDATIONS, 'user_recommendations')
+    )
+    escribir_tabla(
+        pa.table({
+            'user': pa.array(np.repeat(users_activos, top_items.shape[1]), type=pa.int32()),
+            'item': pa.array(top_items.ravel(), type=pa.int32()),
+            'score': pa.array(top_scores.ravel(), type=pa.float32()),
+        }),
+        os.path.join(OUTPUT_RECOMMENDATIONS, 'user_recs_exploded')
+    )
+    print(f"✓ Recomendaciones generadas para {len(users_activos):,} usuarios")
+
+    # Métricas de ranking de las listas publicadas contra las interacciones de test
+    test_indptr, test_indices = csr_desde_pares(users[~train], items[~train], num_users)
+    ranking = metricas_ranking(
+        top_items, users_activos, test_indptr, test_indices, num_items, num_recomendables=len(items_activos)
+    )
+    for nombre, valor in ranking.items():
+        print(f"📈 {nombre}: {valor:.4f}" if isinstance(valor, float) else f"📈 {nombre}: {valor:,}")
+    metricas.update(ranking)
+    escribir_tabla(
+        pa.table({'metric': list(metricas), 'value': [float(v) for v in metricas.values()]}),
+        os.path.join(OUTPUT_METRICS, 'model_evaluation')
+    )
+
+    motor_items = MotorTopK(modelo.item_factors, modelo.user_factors[users_activos])
+    top_users, top_user_scores = motor_items.recomendar(items_activos, k=args.top_k)
+    escribir_tabla(
+        tabla_recomendaciones(items_activos, users_activos[top_users], top_user_scores, 'item', 'user'),
+        os.path.join(OUTPUT_RECOMMENDATIONS, 'item_recommendations')
+    )
+    print(f"✓ Recomendaciones generadas para {len(items_activos):,} canciones")
+
+    # PASO 7: factores (los mapeos ya se extendieron en indexar)
+    escribir_tabla(tabla_factores(modelo.user_factors, users_activos), os.path.join(OUTPUT_MODEL, 'user_factors'))
+    escribir_tabla(tabla_factores(modelo.item_factors, items_activos), os.path.join(OUTPUT_MODEL, 'item_factors'))
+
+    print("\n" + "=" * 80)
+    print(f"JOB 5 (LOCAL) COMPLETADO EN {time.time() - inicio:.1f}s")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+JOB 5 (INCREMENTAL): FOLD-IN DE NUEVAS ESCUCHAS SIN REENTRENAR ALS
+============================================================================
+Objetivo: Mantener frescas las recomendaciones de los usuarios activos
+          (cadencia horaria) sin rehacer los jobs 1, 2 y 5 sobre todo el historial
+Input: particiones nuevas de listening_raw (user_id, track_id, playcount)
+       + historial de los usuarios afectados en listening_clean
+       + particiones ya mergeadas en listening_clean (staging/job2/listening_daily)
+       + factores y mapeos del último entrenamiento (models/als_model/)
+Output: filas actualizadas en models/als_model/user_factors,
+        recommendations/user_recommendations y user_recs_exploded;
+        altas nuevas en models/als_model/user_mapping (append-only)
+============================================================================
+Fold-in: con los factores de items Y fijos, el vector de cada usuario
+afectado es la solución de mínimos cuadrados de su semipaso ALS:
+  explicit (Job 5 en Spark): (Y_u^T Y_u + reg * n_u * I) x_u = Y_u^T r_u
+  implicit (job5_als_local): gradiente conjugado con c_ui = 1 + alpha * r_ui
+Los items sin factores (canciones nuevas) y los cambios que provocarían en
+Y esperan al reentrenamiento completo, que se pide cada --retrain-every
+ejecuciones (código de salida 2). Las particiones que job2_incremental.hql
+ya mergeó en listening_clean (las que tienen carpeta en listening_daily) se
+toman de listening_clean y no se vuelven a sumar desde listening_raw.
+Después de reentrenar:
+    python job5_incremental.py --data-dir ... --listening-raw ... --marcar-reentrenamiento
+
+Uso:
+    python job5_incremental.py --data-dir ../frontend/data --listening-raw data/raw-parquet/listening
+============================================================================
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+
+from als_ann import IndiceIVF
+from als_topk import MotorTopK, cargar_factores
+from job5_als_local import asignar_ids, resolver_factores, tabla_recomendaciones
+from tablas_parquet import escribir_tabla
+
+ESTADO = 'incremental_state.json'
+
+
+# ============================================================================
+# ESTADO: QUÉ PARTICIONES YA SE INCORPORARON
+# ============================================================================
+
+def cargar_estado(model_dir):
+    """
+    base: particiones incluidas en el último entrenamiento completo
+    pendientes: particiones incorporadas por fold-in desde entonces
+    """
+    path = os.path.join(model_dir, ESTADO)
+    if not os.path.exists(path):
+        return {'base': [], 'pendientes': [], 'ejecuciones': 0}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_estado(model_dir, estado):
+    path = os.path.join(model_dir, ESTADO)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def listar_particiones(raw_dir):
+    """Subcarpetas de listening_raw (p.ej. dt=2026-10-18), ordenadas"""
+    return sorted(
+        p for p in os.listdir(raw_dir)
+        if not p.startswith(('.', '_')) and os.path.isdir(os.path.join(raw_dir, p))
+    )
+
+
+# ============================================================================
+# LECTURA DE ESCUCHAS E HISTORIAL
+# ============================================================================
+
+def leer_escuchas(raw_dir, particiones):
+    """Escuchas de las particiones dadas, limpias y agregadas como en el Job 2"""
+    tablas = [
+        ds.dataset(os.path.join(raw_dir, p), format='parquet').to_table(
+            columns=['user_id', 'track_id', 'playcount'],
+            filter=pc.field('user_id').is_valid() & pc.field('track_id').is_valid() & (pc.field('playcount') > 0)
+        )
+        for p in particiones
+    ]
+    table = pa.concat_tables(tablas, promote_options='default')
+    return sumar_escuchas(table.rename_columns(['user_id', 'track_id', 'total_playcount']))
+
+
+def sumar_escuchas(table):
+    """SUM(total_playcount) GROUP BY user_id, track_id"""
+    agregada = table.group_by(['user_id', 'track_id']).aggregate([('total_playcount', 'sum')])
+    return agregada.rename_columns(['user_id', 'track_id', 'total_playcount'])
+
+
+def historial_usuarios(clean_dir, user_ids):
+    """Interacciones de listening_clean de los usuarios dados (filtro empujado al scan)"""
+    if not os.path.exists(clean_dir):
+        return None
+    return ds.dataset(clean_dir, format='parquet').to_table(
+        columns=['user_id', 'track_id', 'total_playcount'],
+        filter=pc.field('user_id').isin(user_ids)
+    )
+
+
+# ============================================================================
+# MAPEOS Y TABLAS (reemplazo de filas por clave)
+# ============================================================================
+
+def reemplazar_filas(folder_path, nuevas, key_col):
+    """
+    Reescribe la tabla con las filas de key_col en nuevas reemplazadas (o
+    agregadas). escribir_tabla arma la versión nueva aparte y la intercambia
+    al final: un fallo a mitad del fold-in deja la tabla anterior intacta.
+    """
+    actual = ds.dataset(folder_path, format='parquet').to_table()
+    vigentes = actual.filter(pc.invert(pc.is_in(actual.column(key_col), value_set=nuevas.column(key_col))))
+    escribir_tabla(pa.concat_tables([vigentes, nuevas.cast(actual.schema)]), folder_path)
+
+
+def tabla_factores_filas(ids, factores):
+    """(id, f0..f{rank-1}) para filas ya alineadas con ids"""
+    columnas = {'id': pa.array(ids, type=pa.int32())}
+    for j in range(factores.shape[1]):
+        columnas[f"f{j}"] = pa.array(factores[:, j], type=pa.float32())
+    return pa.table(columnas)
+
+
+# ============================================================================
+# FOLD-IN
+# ============================================================================
+
+def resolver_explicito(R, Y, reg):
+    """
+    Mínimos cuadrados por fila de R (CSR usuarios x items, data = rating) con
+    la regularización de Spark (reg * n_u). Se arman las matrices normales de
+    un bloque de usuarios a la vez (sort + reduceat) y se resuelven en lote.
+    """
+    rank = Y.shape[1]
+    X = np.zeros((R.shape[0], rank), dtype=np.float32)
+    nnz_por_bloque = max(1, (1 << 25) // (rank * rank))
+    inicio = 0
+    while inicio < R.shape[0]:
+        fin = int(np.searchsorted(R.indptr, R.indptr[inicio] + nnz_por_bloque, side='right')) - 1
+        fin = min(max(fin, inicio + 1), R.shape[0])
+        bloque = R[inicio:fin]
+        n_u = np.diff(bloque.indptr)
+        con_datos = n_u > 0
+        if con_datos.any():
+            Yc = Y[bloque.indices].astype(np.float64)
+            arranques = bloque.indptr[:-1][con_datos]
+            A = np.add.reduceat(Yc[:, :, None] * Yc[:, None, :], arranques, axis=0)
+            b = np.add.reduceat(Yc * bloque.data[:, None], arranques, axis=0)
+            A += reg * n_u[con_datos, None, None] * np.eye(rank)
+            X[inicio:fin][con_datos] = np.linalg.solve(A, b[:, :, None])[:, :, 0]
+        inicio = fin
+    return X
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fold-in incremental de usuarios sobre el modelo ALS del Job 5")
+    parser.add_argument('--data-dir', required=True, help="Raíz con models/, recommendations/ y cleaned/")
+    parser.add_argument('--listening-raw', required=True, help="Carpeta de listening_raw con particiones")
+    parser.add_argument('--listening-clean', default=None, help="Por defecto <data-dir>/cleaned/listening")
+    parser.add_argument('--listening-daily', default=None,
+                        help="Particiones ya mergeadas en listening_clean (por defecto <data-dir>/staging/job2/listening_daily)")
+    parser.add_argument('--feedback', choices=['explicit', 'implicit'], default='explicit',
+                        help="explicit = Job 5 en Spark; implicit = job5_als_local.py")
+    parser.add_argument('--reg', type=float, default=0.1)
+    parser.add_argument('--alpha', type=float, default=40.0)
+    parser.add_argument('--cg-steps', type=int, default=10)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--retrain-every', type=int, default=24, help="Ejecuciones de fold-in entre reentrenamientos")
+    parser.add_argument('--ann-dir', default=None, help="Índices de als_ann.py a actualizar (opcional)")
+    parser.add_argument('--marcar-reentrenamiento', action='store_true',
+                        help="Registrar que se hizo un entrenamiento completo con todas las particiones actuales")
+    args = parser.parse_args()
+
+    MODEL_DIR = os.path.join(args.data_dir, 'models', 'als_model')
+    RECS_DIR = os.path.join(args.data_dir, 'recommendations')
+    CLEAN_DIR = args.listening_clean or os.path.join(args.data_dir, 'cleaned', 'listening')
+    DAILY_DIR = args.listening_daily or os.path.join(args.data_dir, 'staging', 'job2', 'listening_daily')
+
+    estado = cargar_estado(MODEL_DIR)
+    particiones = listar_particiones(args.listening_raw)
+
+    if args.marcar_reentrenamiento:
+        guardar_estado(MODEL_DIR, {'base': particiones, 'pendientes': [], 'ejecuciones': 0})
+        print(f"[OK] Reentrenamiento registrado ({len(particiones)} particiones en la base)")
+        return
+
+    print("=" * 80)
+    print("INICIANDO JOB 5 (INCREMENTAL): FOLD-IN DE USUARIOS")
+    print("=" * 80)
+
+    if estado['ejecuciones'] >= args.retrain_every:
+        print(f"\n⚠️  {estado['ejecuciones']} fold-ins desde el último entrenamiento completo:")
+        print("   correr jobs 1, 2 y 5 y después --marcar-reentrenamiento")
+        sys.exit(2)
+
+    incorporadas = set(estado['base']) | set(estado['pendientes'])
+    nuevas = [p for p in particiones if p not in incorporadas]
+    if not nuevas:
+        print("\n✓ Sin particiones nuevas")
+        return
+
+    inicio = time.time()
+    escuchas = leer_escuchas(args.listening_raw, nuevas)
+    user_ids = pc.unique(escuchas.column('user_id'))
+    print(f"\n📂 {len(nuevas)} particiones nuevas: {escuchas.num_rows:,} pares, {len(user_ids):,} usuarios afectados")
+
+    # Historial completo de los afectados = listening_clean (carga completa +
+    # particiones mergeadas) + lo incorporado por fold-in desde el último
+    # entrenamiento y lo nuevo que todavía no pasó por job2_incremental.hql
+    mergeadas = set(listar_particiones(DAILY_DIR)) if os.path.isdir(DAILY_DIR) else set()
+    nuevas_raw = [p for p in nuevas if p not in mergeadas]
+    previas_raw = [p for p in estado['pendientes'] if p not in mergeadas]
+    ya_mergeadas = len(nuevas) + len(estado['pendientes']) - len(nuevas_raw) - len(previas_raw)
+    if ya_mergeadas:
+        print(f"   Particiones ya mergeadas en listening_clean: {ya_mergeadas}")
+
+    partes = [escuchas.slice(0, 0)]
+    if nuevas_raw == nuevas:
+        partes.append(escuchas)
+    elif nuevas_raw:
+        partes.append(leer_escuchas(args.listening_raw, nuevas_raw))
+    historial = historial_usuarios(CLEAN_DIR, user_ids)
+    if historial is not None:
+        partes.append(historial.cast(escuchas.schema))
+    if previas_raw:
+        previas = leer_escuchas(args.listening_raw, previas_raw)
+        partes.append(previas.filter(pc.is_in(previas.column('user_id'), value_set=user_ids)))
+    interacciones = sumar_escuchas(pa.concat_tables(partes))
+
+    # Índices: usuarios nuevos se dan de alta; tracks sin factores se ignoran
+    Y = np.asarray(cargar_factores(os.path.join(MODEL_DIR, 'item_factors'), cache=False))
+    users_afectados, altas = asignar_ids(
+        os.path.join(MODEL_DIR, 'user_mapping'), 'user_idx', 'user_id', user_ids
+    )
+    mapeo_tracks = ds.dataset(
+        os.path.join(MODEL_DIR, 'track_mapping'), format='parquet',
+        schema=pa.schema([('track_idx', pa.int64()), ('track_id', pa.string())])
+    ).to_table()
+    pos_track = pc.index_in(interacciones.column('track_id'), value_set=mapeo_tracks.column('track_id'))
+    fila_user = pc.index_in(interacciones.column('user_id'), value_set=user_ids).to_numpy(zero_copy_only=False)
+
+    con_track = pos_track.is_valid().to_numpy(zero_copy_only=False)
+    items = np.full(len(con_track), -1, dtype=np.int64)
+    items[con_track] = mapeo_tracks.column('track_idx').to_numpy()[pos_track.drop_null().to_numpy().astype(np.int64)]
+    con_factores = (items >= 0) & (items < len(Y))
+    con_factores[con_factores] = np.any(Y[items[con_factores]] != 0, axis=1)
+    print(f"   Usuarios nuevos: {altas:,} | Interacciones con tracks sin factores: {(~con_factores).sum():,}")
+
+    ratings = interacciones.column('total_playcount').to_numpy().astype(np.float32)
+    filas, items, ratings = fila_user[con_factores].astype(np.int64), items[con_factores], ratings[con_factores]
+    R = sp.csr_matrix((ratings, (filas, items)), shape=(len(user_ids), len(Y)), dtype=np.float32)
+
+    # Fold-in contra Y fijo
+    print(f"\n🚀 Fold-in ({args.feedback}) de {len(user_ids):,} usuarios...")
+    if args.feedback == 'explicit':
+        X = resolver_explicito(R, Y, args.reg)
+        # El Job 5 entrena con nonnegative=True: proyección aproximada
+        np.maximum(X, 0, out=X)
+    else:
+        R.data *= args.alpha
+        # Warm start con los factores actuales de los usuarios ya conocidos
+        X = np.zeros((len(user_ids), Y.shape[1]), dtype=np.float32)
+        previos = cargar_factores(os.path.join(MODEL_DIR, 'user_factors'), cache=False)
+        conocidos = users_afectados < len(previos)
+        X[conocidos] = previos[users_afectados[conocidos]]
+        resolver_factores(R, X, Y, args.reg, cg_steps=args.cg_steps)
+
+    resueltos = np.flatnonzero(np.diff(R.indptr) > 0)
+    ids = users_afectados[resueltos]
+    X = X[resueltos]
+
+    # Actualizar factor store y recomendaciones de los usuarios resueltos
+    reemplazar_filas(os.path.join(MODEL_DIR, 'user_factors'), tabla_factores_filas(ids, X), 'id')
+
+    items_validos = np.flatnonzero(np.any(Y != 0, axis=1))
+    motor = MotorTopK(X, Y[items_validos])
+    top_items, top_scores = motor.recomendar(np.arange(len(ids)), k=args.top_k)
+    top_items = items_validos[top_items]
+
+    reemplazar_filas(
+        os.path.join(RECS_DIR, 'user_recommendations'),
+        tabla_recomendaciones(ids, top_items, top_scores, 'user', 'item'),
+        'user'
+    )
+    reemplazar_filas(
+        os.path.join(RECS_DIR, 'user_recs_exploded'),
+        pa.table({
+            'user': pa.array(np.repeat(ids, top_items.shape[1]), type=pa.int32()),
+            'item': pa.array(top_items.ravel(), type=pa.int32()),
+            'score': pa.array(top_scores.ravel(), type=pa.float32()),
+        }),
+        'user'
+    )
+    print(f"✓ Factores y recomendaciones actualizados para {len(ids):,} usuarios")
+
+    if args.ann_dir:
+        # Los vectores nuevos van al delta del índice (sin reentrenar centroides)
+        path = os.path.join(args.ann_dir, 'users')
+        indice = IndiceIVF.cargar(path)
+        indice.agregar(ids, X)
+        indice.guardar(path)
+        print(f"✓ Índice ANN de usuarios actualizado ({len(indice.delta_ids):,} vectores en el delta)")
+
+    estado['pendientes'] = estado['pendientes'] + nuevas
+    estado['ejecuciones'] += 1
+    guardar_estado(MODEL_DIR, estado)
+
+    print("\n" + "=" * 80)
+    print(f"FOLD-IN COMPLETADO EN {time.time() - inicio:.1f}s "
+          f"({estado['ejecuciones']}/{args.retrain_every} antes del reentrenamiento)")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
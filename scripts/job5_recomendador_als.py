@@ -11,13 +11,43 @@ Output: Modelo ALS + recomendaciones + métricas
 """
 
 from pyspark.sql import SparkSession
-from pyspark.sql.functions import col, count, avg, stddev, min as spark_min, max as spark_max
-from pyspark.sql.types import IntegerType
+from pyspark.sql.functions import (
+    col, count, avg, stddev, min as spark_min, max as spark_max,
+    sum as spark_sum, when, sqrt, abs as spark_abs, approx_count_distinct,
+    explode, collect_list, hash as spark_hash, pmod, lit,
+    posexplode, slice as spark_slice, sort_array, struct
+)
+from pyspark.sql.types import IntegerType, LongType, FloatType
+from pyspark.sql.utils import AnalysisException
 from pyspark.ml.recommendation import ALS
 from pyspark.ml.evaluation import RegressionEvaluator
 from pyspark.ml.tuning import ParamGridBuilder, CrossValidator
+from pyspark.mllib.evaluation import RankingMetrics
+from pyspark import StorageLevel
+import argparse
 import sys
 
+# ============================================================================
+# ARGUMENTOS
+# ============================================================================
+# --stats-level:
+#   none  -> sin diagnósticos (producción: solo acciones que escriben salidas)
+#   basic -> un único pase agregado con conteos y tamaños de train/test
+#   full  -> basic + exploración (distribuciones, muestras, describe)
+# --tune: búsqueda de hiperparámetros (rank, regParam, maxIter) con
+#   CrossValidator entrenando --parallelism candidatos a la vez; el mejor
+#   modelo sigue el resto del job y la grilla se guarda en metrics/tuning/
+# --checkpoint-dir: donde ALS trunca el linaje (HDFS del cluster por defecto)
+
+parser = argparse.ArgumentParser(description="Job 5: recomendador ALS")
+parser.add_argument("--stats-level", choices=["none", "basic", "full"], default="basic")
+parser.add_argument("--tune", action="store_true")
+parser.add_argument("--parallelism", type=int, default=4)
+parser.add_argument("--folds", type=int, default=3)
+parser.add_argument("--checkpoint-dir", default="hdfs:///tmp/maestro-job5-checkpoints")
+args = parser.parse_args()
+STATS_LEVEL = args.stats_level
+
 # ============================================================================
 # CONFIGURACIÓN DE SPARK
 # ============================================================================
@@ -35,6 +65,11 @@ spark = SparkSession.builder \
 
 spark.sparkContext.setLogLevel("WARN")
 
+# ALS itera sobre RDDs con un linaje que crece en cada iteración; con un
+# directorio de checkpoint lo trunca cada checkpointInterval iteraciones
+CHECKPOINT_DIR = args.checkpoint_dir
+spark.sparkContext.setCheckpointDir(CHECKPOINT_DIR)
+
 # Paths en S3
 S3_BUCKET = "s3://emr-logs-1758750407/music-data"
 INPUT_LISTENING = f"{S3_BUCKET}/cleaned/listening/"
@@ -46,6 +81,7 @@ print("\n📂 Configuración de rutas:")
 print(f"   Input: {INPUT_LISTENING}")
 print(f"   Modelo: {OUTPUT_MODEL}")
 print(f"   Recomendaciones: {OUTPUT_RECOMMENDATIONS}")
+print(f"   Nivel de estadísticas: {STATS_LEVEL}")
 
 
 # ============================================================================
@@ -56,32 +92,23 @@ print("\n" + "=" * 80)
 print("PASO 1: CARGA Y EXPLORACIÓN DE DATOS")
 print("=" * 80)
 
-# Cargar listening_clean
-df_listening = spark.read.parquet(INPUT_LISTENING)
-
-print(f"\n✓ Datos cargados: {df_listening.count():,} registros")
-print("\nEsquema:")
-df_listening.printSchema()
-
-# Estadísticas básicas
-print("\n📊 Estadísticas de interacciones:")
-df_listening.select(
-    count("*").alias("total_interactions"),
-    count("user_id").alias("distinct_users"),
-    count("track_id").alias("distinct_tracks"),
-    avg("total_playcount").alias("avg_playcount"),
-    stddev("total_playcount").alias("stddev_playcount"),
-    spark_min("total_playcount").alias("min_playcount"),
-    spark_max("total_playcount").alias("max_playcount")
-).show()
-
-# Distribución de interacciones por usuario
-print("\n📈 Distribución de canciones por usuario:")
-user_songs = df_listening.groupBy("user_id").agg(
-    count("track_id").alias("num_songs"),
-    avg("total_playcount").alias("avg_plays")
-)
-user_songs.describe().show()
+# Cargar listening_clean (solo las columnas que usa el modelo)
+# Se persiste porque lo recorren los dos diccionarios de ids y el join posterior
+df_listening = spark.read.parquet(INPUT_LISTENING) \
+    .select("user_id", "track_id", "total_playcount") \
+    .persist(StorageLevel.MEMORY_AND_DISK)
+
+if STATS_LEVEL == "full":
+    print("\nEsquema:")
+    df_listening.printSchema()
+
+    # Distribución de interacciones por usuario (exploratorio)
+    print("\n📈 Distribución de canciones por usuario:")
+    user_songs = df_listening.groupBy("user_id").agg(
+        count("track_id").alias("num_songs"),
+        avg("total_playcount").alias("avg_plays")
+    )
+    user_songs.describe().show()
 
 
 # ============================================================================
@@ -92,20 +119,53 @@ print("\n" + "=" * 80)
 print("PASO 2: PREPARACIÓN DE DATOS")
 print("=" * 80)
 
-# ALS requiere IDs numéricos, así que creamos índices
-from pyspark.ml.feature import StringIndexer
-
-print("\n⚙️  Creando índices numéricos para usuarios y canciones...")
-
-# Indexar usuarios
-user_indexer = StringIndexer(inputCol="user_id", outputCol="user_idx")
-user_model = user_indexer.fit(df_listening)
-df_indexed = user_model.transform(df_listening)
-
-# Indexar tracks
-track_indexer = StringIndexer(inputCol="track_id", outputCol="track_idx")
-track_model = track_indexer.fit(df_indexed)
-df_indexed = track_model.transform(df_indexed)
+# ALS requiere IDs numéricos. Los índices viven en un diccionario persistente
+# y append-only (models/als_model/user_mapping y track_mapping): los ids ya
+# conocidos conservan su índice entre corridas y los nuevos reciben índices a
+# partir del máximo existente. Todo es distribuido (zipWithIndex), nada de
+# arreglos de labels ni listas en el driver.
+
+def asignar_ids(df, id_col, idx_col, mapping_path):
+    """
+    Extiende el diccionario id -> idx de mapping_path con los ids de df que
+    todavía no tiene y devuelve el diccionario completo (idx_col, id_col).
+    """
+    try:
+        existente = spark.read.parquet(mapping_path).select(
+            col(idx_col).cast(LongType()).alias(idx_col), col(id_col)
+        )
+        siguiente = existente.agg(spark_max(idx_col)).first()[0]
+        siguiente = 0 if siguiente is None else siguiente + 1
+    except AnalysisException:
+        # Primera corrida: todavía no hay diccionario
+        existente, siguiente = None, 0
+
+    nuevos = df.select(id_col).distinct()
+    if existente is not None:
+        nuevos = nuevos.join(existente.select(id_col), id_col, "left_anti")
+
+    # zipWithIndex numera por partición sin pasar por el driver (solo lanza un
+    # job extra para contar filas por partición)
+    df_nuevos = nuevos.rdd.zipWithIndex() \
+        .map(lambda par: (par[1] + siguiente, par[0][0])) \
+        .toDF(f"{idx_col} long, {id_col} string")
+
+    # Append-only: nunca se reescriben índices ya publicados
+    df_nuevos.write.mode("append").parquet(mapping_path)
+    return spark.read.parquet(mapping_path).select(
+        col(idx_col).cast(LongType()).alias(idx_col), col(id_col)
+    )
+
+
+print("\n⚙️  Asignando índices numéricos a usuarios y canciones...")
+
+df_user_mapping = asignar_ids(df_listening, "user_id", "user_idx", f"{OUTPUT_MODEL}/user_mapping/")
+df_track_mapping = asignar_ids(df_listening, "track_id", "track_idx", f"{OUTPUT_MODEL}/track_mapping/")
+print(f"✓ Diccionarios actualizados en {OUTPUT_MODEL}/user_mapping/ y track_mapping/")
+
+df_indexed = df_listening \
+    .join(df_user_mapping, "user_id") \
+    .join(df_track_mapping, "track_id")
 
 # Seleccionar columnas necesarias y convertir a int
 df_als = df_indexed.select(
@@ -114,25 +174,62 @@ df_als = df_indexed.select(
     col("total_playcount").cast(IntegerType()).alias("rating")
 )
 
-print(f"✓ Datos indexados: {df_als.count():,} registros")
-print("\nMuestra de datos preparados:")
-df_als.show(10)
-
 # Filtrar usuarios/canciones con muy pocas interacciones (mejora calidad)
 print("\n🔍 Aplicando filtros de calidad...")
 
 min_user_interactions = 5  # Usuario debe tener al menos 5 canciones
 min_item_interactions = 5  # Canción debe tener al menos 5 usuarios
 
-user_counts = df_als.groupBy("user").count().filter(col("count") >= min_user_interactions)
-item_counts = df_als.groupBy("item").count().filter(col("count") >= min_item_interactions)
-
-df_filtered = df_als.join(user_counts.select("user"), "user") \
-                    .join(item_counts.select("item"), "item")
-
-print(f"✓ Después de filtrado: {df_filtered.count():,} registros")
-print(f"   Usuarios únicos: {df_filtered.select('user').distinct().count():,}")
-print(f"   Canciones únicas: {df_filtered.select('item').distinct().count():,}")
+user_counts = df_als.groupBy("user").count() \
+    .select("user", (col("count") >= min_user_interactions).alias("user_ok"))
+item_counts = df_als.groupBy("item").count() \
+    .select("item", (col("count") >= min_item_interactions).alias("item_ok"))
+
+# En vez de descartar filas con un inner join se marcan: así un único pase
+# agregado da a la vez los conteos antes y después del filtro. La división
+# train/test también queda marcada (columna is_train) para que sus tamaños
+# salgan del mismo pase. Sale de un hash de (user, item) y no de rand(): un
+# par cae siempre del mismo lado aunque cambien las particiones o se
+# recalcule una partición perdida.
+df_marcado = df_als.join(user_counts, "user").join(item_counts, "item") \
+    .select(
+        "user", "item", "rating",
+        (col("user_ok") & col("item_ok")).alias("valido"),
+        (pmod(spark_hash(col("user"), col("item"), lit(42)), lit(100)) < 80).alias("is_train")
+    ) \
+    .persist(StorageLevel.MEMORY_AND_DISK)
+
+df_filtered = df_marcado.filter(col("valido")).select("user", "item", "rating", "is_train")
+
+if STATS_LEVEL != "none":
+    # Único pase de diagnóstico (materializa df_marcado en caché)
+    print("\n📊 Estadísticas de interacciones:")
+    stats = df_marcado.agg(
+        count("*").alias("total_interactions"),
+        approx_count_distinct("user").alias("distinct_users"),
+        approx_count_distinct("item").alias("distinct_tracks"),
+        avg("rating").alias("avg_playcount"),
+        stddev("rating").alias("stddev_playcount"),
+        spark_min("rating").alias("min_playcount"),
+        spark_max("rating").alias("max_playcount"),
+        spark_sum(when(col("valido"), 1).otherwise(0)).alias("filtered_interactions"),
+        approx_count_distinct(when(col("valido"), col("user"))).alias("filtered_users"),
+        approx_count_distinct(when(col("valido"), col("item"))).alias("filtered_tracks"),
+        spark_sum(when(col("valido") & col("is_train"), 1).otherwise(0)).alias("train_interactions")
+    ).first()
+
+    print(f"   Interacciones: {stats['total_interactions']:,}")
+    print(f"   Usuarios: ~{stats['distinct_users']:,}  |  Canciones: ~{stats['distinct_tracks']:,}")
+    print(f"   Playcount: media {stats['avg_playcount']:.2f}, desv. {stats['stddev_playcount']:.2f}, "
+          f"rango [{stats['min_playcount']}, {stats['max_playcount']}]")
+
+    print(f"\n✓ Después de filtrado: {stats['filtered_interactions']:,} registros")
+    print(f"   Usuarios únicos: ~{stats['filtered_users']:,}")
+    print(f"   Canciones únicas: ~{stats['filtered_tracks']:,}")
+
+if STATS_LEVEL == "full":
+    print("\nMuestra de datos preparados:")
+    df_filtered.show(10)
 
 
 # ============================================================================
@@ -143,12 +240,17 @@ print("\n" + "=" * 80)
 print("PASO 3: DIVISIÓN TRAIN/TEST")
 print("=" * 80)
 
-# Split 80/20
-(training, test) = df_filtered.randomSplit([0.8, 0.2], seed=42)
+# Split 80/20 (marcado en df_marcado con el hash de (user, item))
+training = df_filtered.filter(col("is_train")).select("user", "item", "rating")
+test = df_filtered.filter(~col("is_train")).select("user", "item", "rating")
 
-print(f"\n📊 Distribución de datos:")
-print(f"   Training: {training.count():,} registros ({training.count()/df_filtered.count()*100:.1f}%)")
-print(f"   Test: {test.count():,} registros ({test.count()/df_filtered.count()*100:.1f}%)")
+if STATS_LEVEL != "none":
+    n_total = stats['filtered_interactions']
+    n_train = stats['train_interactions']
+    n_test = n_total - n_train
+    print(f"\n📊 Distribución de datos:")
+    print(f"   Training: {n_train:,} registros ({n_train / max(n_total, 1) * 100:.1f}%)")
+    print(f"   Test: {n_test:,} registros ({n_test / max(n_total, 1) * 100:.1f}%)")
 
 
 # ============================================================================
@@ -171,13 +273,55 @@ als = ALS(
     ratingCol="rating",
     coldStartStrategy="drop",  # Ignorar usuarios/items nuevos en test
     implicitPrefs=False,  # Ratings explícitos (playcount)
-    nonnegative=True  # Factores no negativos
+    nonnegative=True,  # Factores no negativos
+    checkpointInterval=5  # Trunca el linaje cada 5 iteraciones (ver CHECKPOINT_DIR)
 )
 
-print("\n🚀 Entrenando modelo ALS...")
-print("   (esto puede tardar 3-5 minutos)")
-
-model = als.fit(training)
+if args.tune:
+    # Spark ALS no expone la métrica por iteración, así que aquí no hay poda
+    # temprana: la concurrencia viene de parallelism (varios fits a la vez sobre
+    # el mismo training cacheado). La poda por iteración está en el modo local
+    # (job5_tuning_local.py). alpha solo aplica con implicitPrefs=True.
+    param_grid = ParamGridBuilder() \
+        .addGrid(als.rank, [10, 20, 40]) \
+        .addGrid(als.regParam, [0.01, 0.1, 1.0]) \
+        .addGrid(als.maxIter, [5, 10, 15]) \
+        .build()
+
+    cv = CrossValidator(
+        estimator=als,
+        estimatorParamMaps=param_grid,
+        evaluator=RegressionEvaluator(metricName="rmse", labelCol="rating", predictionCol="prediction"),
+        numFolds=args.folds,
+        parallelism=args.parallelism,
+        seed=42
+    )
+
+    print(f"\n🔎 Búsqueda de hiperparámetros: {len(param_grid)} candidatos, "
+          f"{args.folds} folds, {args.parallelism} en paralelo...")
+    cv_model = cv.fit(training)
+    model = cv_model.bestModel
+
+    df_tuning = spark.createDataFrame(
+        [
+            (params[als.rank], float(params[als.regParam]), params[als.maxIter], float(rmse_cv))
+            for params, rmse_cv in zip(param_grid, cv_model.avgMetrics)
+        ],
+        ["rank", "regParam", "maxIter", "rmse"]
+    )
+    df_tuning.coalesce(1).write.mode("overwrite").parquet(f"{OUTPUT_METRICS}/tuning/")
+
+    mejor = min(range(len(param_grid)), key=lambda i: cv_model.avgMetrics[i])
+    MAX_ITER = param_grid[mejor][als.maxIter]
+    print(f"✓ Mejor configuración: rank={model.rank}, regParam={param_grid[mejor][als.regParam]}, "
+          f"maxIter={MAX_ITER} (RMSE CV {cv_model.avgMetrics[mejor]:.4f})")
+    print(f"✓ Resultados guardados en {OUTPUT_METRICS}/tuning/")
+else:
+    print("\n🚀 Entrenando modelo ALS...")
+    print("   (esto puede tardar 3-5 minutos)")
+
+    model = als.fit(training)
+    MAX_ITER = als.getMaxIter()
 
 print("✓ Modelo entrenado exitosamente!")
 
@@ -195,32 +339,24 @@ print("\n📊 Generando predicciones en test set...")
 predictions = model.transform(test)
 predictions_clean = predictions.filter(col("prediction").isNotNull())
 
-print(f"✓ Predicciones generadas: {predictions_clean.count():,}")
-
-# Evaluar RMSE (Root Mean Square Error)
-evaluator = RegressionEvaluator(
-    metricName="rmse",
-    labelCol="rating",
-    predictionCol="prediction"
-)
-
-rmse = evaluator.evaluate(predictions_clean)
+# RMSE y MAE en una sola agregación (dos RegressionEvaluator = dos pases)
+error = col("prediction") - col("rating")
+evaluacion = predictions_clean.agg(
+    count("*").alias("n"),
+    sqrt(avg(error * error)).alias("rmse"),
+    avg(spark_abs(error)).alias("mae")
+).first()
+# Sin predicciones (test vacío o solo cold start) las métricas quedan en NaN,
+# como devolvía RegressionEvaluator
+rmse = float("nan") if evaluacion["rmse"] is None else evaluacion["rmse"]
+mae = float("nan") if evaluacion["mae"] is None else evaluacion["mae"]
+
+print(f"✓ Predicciones generadas: {evaluacion['n']:,}")
 print(f"\n📈 RMSE del modelo: {rmse:.4f}")
-
-# Evaluar MAE (Mean Absolute Error)
-evaluator_mae = RegressionEvaluator(
-    metricName="mae",
-    labelCol="rating",
-    predictionCol="prediction"
-)
-mae = evaluator_mae.evaluate(predictions_clean)
 print(f"📈 MAE del modelo: {mae:.4f}")
 
-# Guardar métricas
+# Las métricas se guardan en el PASO 6, junto con las de ranking
 metrics_data = [("RMSE", rmse), ("MAE", mae)]
-df_metrics = spark.createDataFrame(metrics_data, ["metric", "value"])
-df_metrics.coalesce(1).write.mode("overwrite").parquet(f"{OUTPUT_METRICS}/model_evaluation/")
-print(f"\n✓ Métricas guardadas en {OUTPUT_METRICS}/model_evaluation/")
 
 
 # ============================================================================
@@ -233,25 +369,85 @@ print("=" * 80)
 
 # Top 10 recomendaciones para cada usuario
 print("\n⚙️  Generando top 10 recomendaciones por usuario...")
-user_recs = model.recommendForAllUsers(10)
-print(f"✓ Recomendaciones generadas para {user_recs.count():,} usuarios")
+# Un solo recommendForAllUsers (la etapa más cara después del entrenamiento)
+# con MARGEN_RANKING candidatos de más: las listas publicadas son sus primeros
+# K y la evaluación descarta de ellos los items de train. Se persiste porque
+# lo recorren la escritura, la evaluación y el PASO 8 (formato expandido).
+K = 10
+MARGEN_RANKING = 50
+recs_ampliadas = model.recommendForAllUsers(K + MARGEN_RANKING).persist(StorageLevel.MEMORY_AND_DISK)
+user_recs = recs_ampliadas.select("user", spark_slice(col("recommendations"), 1, K).alias("recommendations"))
 
 # Guardar recomendaciones
 user_recs.write.mode("overwrite").parquet(f"{OUTPUT_RECOMMENDATIONS}/user_recommendations/")
 print(f"✓ Guardadas en {OUTPUT_RECOMMENDATIONS}/user_recommendations/")
 
-# Ejemplo de recomendaciones
-print("\n📋 Ejemplo de recomendaciones (primeros 5 usuarios):")
-user_recs.show(5, truncate=False)
+if STATS_LEVEL != "none":
+    print(f"✓ Recomendaciones generadas para {user_recs.count():,} usuarios")
+
+if STATS_LEVEL == "full":
+    # Ejemplo de recomendaciones
+    print("\n📋 Ejemplo de recomendaciones (primeros 5 usuarios):")
+    user_recs.show(5, truncate=False)
+
+# Métricas de ranking: RMSE/MAE no dicen nada de una lista top-10. Las listas
+# evaluadas son los K mejores items que el usuario NO tiene en train (como
+# excluir=train_csr en job5_als_local/job5_tuning_local): un item ya conocido
+# nunca puede estar en test y solo diluiría precision/recall/NDCG/MAP. Se
+# cruzan con las interacciones de test de cada usuario y RankingMetrics
+# recorre los pares cacheados. Un usuario con más de MARGEN_RANKING items de
+# train entre sus candidatos queda con una lista de menos de K.
+print("\n📊 Evaluando rankings contra el test set...")
+listas_eval = recs_ampliadas \
+    .select("user", posexplode(col("recommendations.item")).alias("pos", "item")) \
+    .join(training.select("user", "item"), ["user", "item"], "left_anti") \
+    .groupBy("user") \
+    .agg(sort_array(collect_list(struct("pos", "item"))).alias("candidatos")) \
+    .select("user", spark_slice(col("candidatos.item"), 1, K).alias("pred")) \
+    .persist(StorageLevel.MEMORY_AND_DISK)
+relevantes = test.groupBy("user").agg(collect_list("item").alias("labels"))
+pares_ranking = listas_eval \
+    .join(relevantes, "user") \
+    .select("pred", "labels") \
+    .rdd.map(lambda r: (r.pred, r.labels)) \
+    .persist(StorageLevel.MEMORY_AND_DISK)
+
+ranking = RankingMetrics(pares_ranking)
+items_recomendados = listas_eval.select(explode(col("pred"))).distinct().count()
+# Cobertura sobre los items que el modelo puede recomendar (los que tienen
+# factores, es decir con al menos una interacción de train): el mismo
+# denominador que usa metricas_ranking en la versión local
+items_recomendables = model.itemFactors.count()
+metrics_data += [
+    (f"precision@{K}", float(ranking.precisionAt(K))),
+    (f"recall@{K}", float(ranking.recallAt(K))),
+    (f"ndcg@{K}", float(ranking.ndcgAt(K))),
+    (f"map@{K}", float(ranking.meanAveragePrecisionAt(K))),
+    ("catalog_coverage", items_recomendados / items_recomendables),
+    ("users_evaluated", float(pares_ranking.count())),
+]
+pares_ranking.unpersist()
+listas_eval.unpersist()
+
+for nombre, valor in metrics_data[2:]:
+    print(f"📈 {nombre}: {valor:.4f}")
+
+df_metrics = spark.createDataFrame(metrics_data, ["metric", "value"])
+df_metrics.coalesce(1).write.mode("overwrite").parquet(f"{OUTPUT_METRICS}/model_evaluation/")
+print(f"\n✓ Métricas guardadas en {OUTPUT_METRICS}/model_evaluation/")
 
 # Top 10 usuarios similares para cada canción
 print("\n⚙️  Generando top 10 usuarios por canción...")
 item_recs = model.recommendForAllItems(10)
-print(f"✓ Recomendaciones generadas para {item_recs.count():,} canciones")
 
 item_recs.write.mode("overwrite").parquet(f"{OUTPUT_RECOMMENDATIONS}/item_recommendations/")
 print(f"✓ Guardadas en {OUTPUT_RECOMMENDATIONS}/item_recommendations/")
 
+if STATS_LEVEL != "none":
+    # El conteo de una carpeta Parquet recién escrita sale de los footers
+    n_items = spark.read.parquet(f"{OUTPUT_RECOMMENDATIONS}/item_recommendations/").count()
+    print(f"✓ Recomendaciones generadas para {n_items:,} canciones")
+
 
 # ============================================================================
 # PASO 7: CASOS DE USO PRÁCTICOS
@@ -261,35 +457,28 @@ print("\n" + "=" * 80)
 print("PASO 7: CASOS DE USO Y ANÁLISIS")
 print("=" * 80)
 
-# Recuperar mapeos originales
-user_labels = user_model.labels
-track_labels = track_model.labels
-
-# Crear DataFrames con los mapeos
-df_user_mapping = spark.createDataFrame(
-    [(i, user_id) for i, user_id in enumerate(user_labels)],
-    ["user_idx", "user_id"]
-)
-
-df_track_mapping = spark.createDataFrame(
-    [(i, track_id) for i, track_id in enumerate(track_labels)],
-    ["track_idx", "track_id"]
-)
+# Exportar factores latentes como columnas float32 densas (id, f0..f{rank-1}).
+# Con ellos als_topk.py calcula top-K bajo demanda (cualquier K, filtros) sin cluster.
+def exportar_factores(df_factores, destino):
+    df_factores.select(
+        col("id"),
+        *[col("features")[i].cast(FloatType()).alias(f"f{i}") for i in range(model.rank)]
+    ).write.mode("overwrite").parquet(destino)
 
-# Guardar mapeos para uso futuro
-df_user_mapping.write.mode("overwrite").parquet(f"{OUTPUT_MODEL}/user_mapping/")
-df_track_mapping.write.mode("overwrite").parquet(f"{OUTPUT_MODEL}/track_mapping/")
-print("✓ Mapeos guardados para uso posterior")
+exportar_factores(model.userFactors, f"{OUTPUT_MODEL}/user_factors/")
+exportar_factores(model.itemFactors, f"{OUTPUT_MODEL}/item_factors/")
+print(f"✓ Factores exportados en {OUTPUT_MODEL}/user_factors/ y item_factors/")
 
-# Ejemplo: Recomendaciones para usuarios específicos
-print("\n📌 EJEMPLO: Recomendaciones para usuarios de muestra")
+if STATS_LEVEL == "full":
+    # Ejemplo: Recomendaciones para usuarios específicos
+    print("\n📌 EJEMPLO: Recomendaciones para usuarios de muestra")
 
-# Tomar 5 usuarios aleatorios
-sample_users = df_filtered.select("user").distinct().limit(5)
-sample_recs = model.recommendForUserSubset(sample_users, 5)
+    # Tomar 5 usuarios aleatorios
+    sample_users = df_filtered.select("user").distinct().limit(5)
+    sample_recs = model.recommendForUserSubset(sample_users, 5)
 
-print("\nTop 5 recomendaciones para usuarios de muestra:")
-sample_recs.show(truncate=False)
+    print("\nTop 5 recomendaciones para usuarios de muestra:")
+    sample_recs.show(truncate=False)
 
 
 # ============================================================================
@@ -315,8 +504,9 @@ user_recs_exploded = user_recs.select(
     F_col("rec.rating").alias("score")
 )
 
-print("\nDistribución de scores de recomendación:")
-user_recs_exploded.select("score").describe().show()
+if STATS_LEVEL == "full":
+    print("\nDistribución de scores de recomendación:")
+    user_recs_exploded.select("score").describe().show()
 
 # Guardar recomendaciones en formato legible
 user_recs_exploded.write.mode("overwrite").parquet(
@@ -324,6 +514,11 @@ user_recs_exploded.write.mode("overwrite").parquet(
 )
 print(f"✓ Recomendaciones en formato expandido guardadas")
 
+# Liberar cachés
+recs_ampliadas.unpersist()
+df_marcado.unpersist()
+df_listening.unpersist()
+
 
 # ============================================================================
 # RESUMEN FINAL
@@ -336,10 +531,12 @@ print("=" * 80)
 print(f"""
 📊 RESUMEN DEL MODELO:
    • Algoritmo: ALS (Alternating Least Squares)
-   • Factores latentes (rank): 10
-   • Iteraciones: 10
+   • Factores latentes (rank): {model.rank}
+   • Iteraciones: {MAX_ITER}
    • RMSE: {rmse:.4f}
    • MAE: {mae:.4f}
+   • Precision@{K}: {dict(metrics_data)[f"precision@{K}"]:.4f}
+   • NDCG@{K}: {dict(metrics_data)[f"ndcg@{K}"]:.4f}
    
 📁 ARCHIVOS GENERADOS:
    • Modelo ALS: {OUTPUT_MODEL}
@@ -347,6 +544,7 @@ print(f"""
    • Recomendaciones por canción: {OUTPUT_RECOMMENDATIONS}/item_recommendations/
    • Métricas: {OUTPUT_METRICS}/model_evaluation/
    • Mapeos: {OUTPUT_MODEL}/user_mapping/ y track_mapping/
+   • Factores: {OUTPUT_MODEL}/user_factors/ y item_factors/
 
 ✅ El modelo está listo para generar recomendaciones personalizadas!
 """)
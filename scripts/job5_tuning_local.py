@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+JOB 5 (MODO LOCAL): BÚSQUEDA DE HIPERPARÁMETROS PARA ALS IMPLÍCITO
+============================================================================
+Objetivo: Elegir rank, reg, alpha e iteraciones sin multiplicar horas de cluster
+Input: listening_clean (Parquet local o s3://)
+Output: metrics/tuning (una fila por configuración, con su curva)
+============================================================================
+Cada configuración se entrena en su propio proceso (ProcessPoolExecutor) y
+se evalúa en validación después de cada iteración (recall@K sobre una
+muestra de usuarios). La validación es una división de las filas de train
+del Job 5 local: su test no se mira durante la búsqueda. Poda por regla de la mediana: una configuración se
+corta si, a partir de --min-iterations, su mejor valor hasta ahora queda por
+debajo de la mediana de las demás configuraciones en la misma iteración.
+El número de iteraciones se elige a la vez: es la iteración con mejor valor.
+
+Uso:
+    python job5_tuning_local.py --input data/cleaned/listening --output-dir ../frontend/data
+    python job5_tuning_local.py --input ... --output-dir ... --search random --trials 20
+============================================================================
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pyarrow as pa
+
+from als_topk import MotorTopK, csr_desde_pares
+from job5_als_local import (
+    ALSImplicito, cargar_interacciones, dividir_train_test,
+    filtrar_min_interacciones, indexar, matriz_confianza
+)
+from metricas_ranking import metricas_ranking
+from tablas_parquet import escribir_tabla
+
+ESPACIO = {
+    'rank': [10, 20, 40],
+    'reg': [0.01, 0.1, 1.0],
+    'alpha': [1.0, 10.0, 40.0],
+}
+
+# Estado compartido entre procesos (lo fija _iniciar_worker)
+_DATOS = None
+_CURVAS = None
+
+
+def configuraciones(search, trials, seed=42):
+    """Lista de dicts {rank, reg, alpha}: grilla completa o muestreo aleatorio"""
+    grilla = [dict(zip(ESPACIO, valores)) for valores in itertools.product(*ESPACIO.values())]
+    if search == 'grid':
+        return grilla
+    rng = np.random.default_rng(seed)
+    elegidas = rng.choice(len(grilla), size=min(trials, len(grilla)), replace=False)
+    return [grilla[i] for i in elegidas]
+
+
+def _iniciar_worker(datos, curvas):
+    global _DATOS, _CURVAS
+    _DATOS = datos
+    _CURVAS = curvas
+
+
+def _debe_podar(trial, iteracion, mejor, min_iterations, min_trials):
+    """Regla de la mediana sobre las curvas publicadas por las demás configuraciones"""
+    if iteracion < min_iterations:
+        return False
+    otras = [c[iteracion - 1] for t, c in _CURVAS.items() if t != trial and len(c) >= iteracion]
+    return len(otras) >= min_trials and mejor < np.median(otras)
+
+
+def entrenar_configuracion(trial, config, max_iterations, k, min_iterations, min_trials):
+    """Entrena una configuración con poda temprana; devuelve la fila de resultados"""
+    d = _DATOS
+    inicio = time.time()
+    Cui = matriz_confianza(d['users'], d['items'], d['ratings'], d['num_users'], d['num_items'], config['alpha'])
+    # Un hilo por configuración: el paralelismo está entre procesos
+    modelo = ALSImplicito(
+        rank=config['rank'], reg=config['reg'], alpha=config['alpha'],
+        iterations=max_iterations, threads=1
+    )
+    curva = []
+    estado = {'podada': False}
+
+    def evaluar(it, m):
+        motor = MotorTopK(m.user_factors, m.item_factors)
+        top_items, _ = motor.recomendar(d['val_users'], k=k, excluir=d['train_csr'])
+        metricas = metricas_ranking(top_items, d['val_users'], *d['val_csr'], d['num_items'])
+        curva.append(metricas[f'recall@{k}'])
+        _CURVAS[trial] = list(curva)
+        if _debe_podar(trial, it, max(curva), min_iterations, min_trials):
+            estado['podada'] = True
+            return True
+        return False
+
+    modelo.fit(Cui, callback=evaluar)
+    mejor = int(np.argmax(curva))
+    return {
+        'trial': trial,
+        **config,
+        'iterations': len(curva),
+        'best_iteration': mejor + 1,
+        f'recall_at_{k}': curva[mejor],
+        'pruned': estado['podada'],
+        'seconds': time.time() - inicio,
+        'curve': curva,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda de hiperparámetros para el Job 5 local")
+    parser.add_argument('--input', required=True, help="Carpeta Parquet de listening_clean")
+    parser.add_argument('--output-dir', required=True, help="Raíz de salida (p.ej. ../frontend/data)")
+    parser.add_argument('--search', choices=['grid', 'random'], default='grid')
+    parser.add_argument('--trials', type=int, default=10, help="Configuraciones en modo random")
+    parser.add_argument('--max-iterations', type=int, default=15)
+    parser.add_argument('--min-iterations', type=int, default=3, help="Iteraciones antes de poder podar")
+    parser.add_argument('--min-trials', type=int, default=3, help="Curvas de referencia para podar")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--val-users', type=int, default=2000, help="Usuarios de validación muestreados")
+    parser.add_argument('--min-interactions', type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("INICIANDO JOB 5 (LOCAL): BÚSQUEDA DE HIPERPARÁMETROS")
+    print("=" * 80)
+
+    inicio = time.time()
+    users, items, ratings, num_users, num_items = indexar(cargar_interacciones(args.input))
+    users, items, ratings = filtrar_min_interacciones(
+        users, items, ratings, args.min_interactions, args.min_interactions
+    )
+    # El test de job5_als_local (misma división, mismas filas) queda afuera:
+    # la validación sale de una segunda división de sus filas de train
+    train = dividir_train_test(len(users))
+    users, items, ratings = users[train], items[train], ratings[train]
+    ajuste = dividir_train_test(len(users), seed=43)
+
+    # Usuarios de validación: muestra de los que tienen interacciones fuera de ajuste
+    rng = np.random.default_rng(42)
+    candidatos = np.unique(users[~ajuste])
+    val_users = np.sort(rng.choice(candidatos, size=min(args.val_users, len(candidatos)), replace=False))
+
+    datos = {
+        'users': users[ajuste], 'items': items[ajuste], 'ratings': ratings[ajuste],
+        'num_users': num_users, 'num_items': num_items,
+        'train_csr': csr_desde_pares(users[ajuste], items[ajuste], num_users),
+        'val_csr': csr_desde_pares(users[~ajuste], items[~ajuste], num_users),
+        'val_users': val_users,
+    }
+
+    candidatas = configuraciones(args.search, args.trials)
+    workers = args.workers or min(len(candidatas), os.cpu_count())
+    print(f"\n🔎 {len(candidatas)} configuraciones, {workers} procesos, hasta {args.max_iterations} iteraciones")
+    print(f"   Validación: recall@{args.k} sobre {len(val_users):,} usuarios")
+
+    resultados = []
+    with multiprocessing.Manager() as manager:
+        curvas = manager.dict()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker, initargs=(datos, curvas)) as pool:
+            futuros = [
+                pool.submit(
+                    entrenar_configuracion, trial, config, args.max_iterations,
+                    args.k, args.min_iterations, args.min_trials
+                )
+                for trial, config in enumerate(candidatas)
+            ]
+            for futuro in as_completed(futuros):
+                r = futuro.result()
+                resultados.append(r)
+                estado = "podada" if r['pruned'] else "completa"
+                print(f"   [{r['trial']:>3}] rank={r['rank']:<3} reg={r['reg']:<5} alpha={r['alpha']:<5} "
+                      f"recall@{args.k}={r[f'recall_at_{args.k}']:.4f} "
+                      f"(iter {r['best_iteration']}/{r['iterations']}, {estado}, {r['seconds']:.1f}s)")
+
+    resultados.sort(key=lambda r: r['trial'])
+    columnas = {c: [r[c] for r in resultados] for c in resultados[0] if c != 'curve'}
+    columnas['curve'] = pa.array([r['curve'] for r in resultados], type=pa.list_(pa.float64()))
+    escribir_tabla(pa.table(columnas), os.path.join(args.output_dir, 'metrics', 'tuning'))
+
+    mejor = max(resultados, key=lambda r: r[f'recall_at_{args.k}'])
+    podadas = sum(r['pruned'] for r in resultados)
+    print("\n" + "=" * 80)
+    print(f"BÚSQUEDA COMPLETADA EN {time.time() - inicio:.1f}s ({podadas} configuraciones podadas)")
+    print("=" * 80)
+    print(f"   Mejor: --rank {mejor['rank']} --reg {mejor['reg']} --alpha {mejor['alpha']} "
+          f"--iterations {mejor['best_iteration']}  (recall@{args.k} {mejor[f'recall_at_{args.k}']:.4f})")
+    print(f"   Resultados en {os.path.join(args.output_dir, 'metrics', 'tuning')}")
+
+
+if __name__ == '__main__':
+    main()
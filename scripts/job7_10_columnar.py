@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+JOBS 7-10 (MODO COLUMNAR): GROUP-BY CON ARROW/NUMPY SOBRE PARQUET
+============================================================================
+Objetivo: Las mismas cuatro salidas que los jobs MapReduce 7-10 sin pasar
+          por las tablas TSV de job7_10_prepare_all.hql ni parsear texto
+Input: listening_clean y music_clean (Parquet local o s3://)
+Output: Parquet (part-00000.snappy.parquet + _SUCCESS) en
+        job7_artist_plays   (artist, total_plays)
+        job8_user_genres    (user_id, top_genres "genre:plays,...")
+        job9_decade_stats   (decade, song_count, avg_danceability, avg_energy, avg_tempo, avg_valence)
+        job10_user_activity (user_id, total_songs, total_plays, user_type)
+============================================================================
+Cada clave se codifica una sola vez con dictionary_encode (los artistas y
+géneros se normalizan por canción, ~50K filas, y se propagan a las escuchas
+con el índice del join) y las agregaciones son np.bincount sobre los códigos.
+Las reglas de limpieza son las de los mappers: minúsculas + strip, se
+descartan claves vacías/nulas, 'unknown' en géneros y features nulas en el 9.
+
+Uso:
+    python job7_10_columnar.py --listening data/cleaned/listening --music data/cleaned/music --output-dir ../frontend/data
+    python job7_10_columnar.py ... --jobs 7,10
+============================================================================
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from tablas_parquet import escribir_tabla
+
+# Mismos cortes que get_decade (job9) y classify_user (job10)
+DECADE_BINS = np.array([1950, 1960, 1970, 1980, 1990, 2000, 2010])
+DECADE_LABELS = ['Pre-1950', '1950s', '1960s', '1970s', '1980s', '1990s', '2000s', '2010s+', 'Unknown']
+USER_TYPE_BINS = np.array([5, 20, 50, 100])
+USER_TYPE_LABELS = ['casual', 'regular', 'active', 'heavy', 'power_user']
+
+SALIDAS = {
+    '7': 'job7_artist_plays',
+    '8': 'job8_user_genres',
+    '9': 'job9_decade_stats',
+    '10': 'job10_user_activity',
+}
+
+
+# ============================================================================
+# CODIFICACIÓN DE CLAVES
+# ============================================================================
+
+def codificar(columna, minusculas=False, excluir=()):
+    """
+    Códigos densos de una columna string: dictionary_encode y normalización
+    (strip y opcionalmente lower) sobre el diccionario, no sobre las filas.
+    Valores que colapsan al normalizar comparten código; nulos, vacíos y
+    'excluir' quedan en -1. Devuelve (códigos int64, etiquetas).
+    """
+    encoded = pc.dictionary_encode(columna).combine_chunks()
+    etiquetas = pc.ascii_trim_whitespace(encoded.dictionary)
+    if minusculas:
+        etiquetas = pc.utf8_lower(etiquetas)
+
+    # Reagrupar el diccionario normalizado (" Rock" y "rock" -> mismo código)
+    unicas = pc.unique(etiquetas)
+    validas = pc.and_(pc.invert(pc.is_in(unicas, pa.array(['', *excluir]))), pc.is_valid(unicas))
+    unicas = unicas.filter(validas)
+    remap = pc.index_in(etiquetas, value_set=unicas).fill_null(-1).to_numpy()
+
+    codigos = encoded.indices.fill_null(-1).to_numpy().astype(np.int64)
+    codigos = np.where(codigos >= 0, remap[codigos], -1)
+    return codigos, unicas
+
+
+def ordenar_por(table, columna):
+    """Orden por clave, como la salida de los reducers"""
+    return table.take(pc.sort_indices(table, sort_keys=[(columna, 'ascending')]))
+
+
+# ============================================================================
+# JOBS
+# ============================================================================
+
+def artist_plays(track_pos, plays, music):
+    """Job 7: total de plays por artista"""
+    artist_track, artists = codificar(music.column('artist'), minusculas=True, excluir=('artist',))
+    codigos = np.where(track_pos >= 0, artist_track[track_pos], -1)
+    ok = (codigos >= 0) & (plays >= 0)
+
+    n = len(artists)
+    filas = np.bincount(codigos[ok], minlength=n)
+    totales = np.bincount(codigos[ok], weights=plays[ok], minlength=n)
+    con_filas = np.flatnonzero(filas)
+    return ordenar_por(pa.table({
+        'artist': artists.take(pa.array(con_filas)),
+        'total_plays': pa.array(np.rint(totales[con_filas]).astype(np.int64)),
+    }), 'artist'), int((~ok).sum())
+
+
+def user_genres(user_codes, users, track_pos, plays, music, top=3):
+    """Job 8: top 3 géneros por usuario (desempate por nombre de género)"""
+    genre_track, genres = codificar(music.column('genre'), minusculas=True, excluir=('unknown',))
+    genre_codes = np.where(track_pos >= 0, genre_track[track_pos], -1)
+    ok = (genre_codes >= 0) & (user_codes >= 0) & (plays >= 0)
+
+    # Clave compuesta usuario*G + género: unique ordena por usuario de paso
+    G = len(genres)
+    claves, inversa = np.unique(user_codes[ok] * G + genre_codes[ok], return_inverse=True)
+    totales = np.rint(np.bincount(inversa, weights=plays[ok])).astype(np.int64)
+    u, g = claves // G, claves % G
+
+    # Por usuario: plays descendente, luego nombre de género
+    rango_genero = np.empty(G, dtype=np.int64)
+    rango_genero[pc.sort_indices(genres).to_numpy()] = np.arange(G)
+    orden = np.lexsort((rango_genero[g], -totales, u))
+    u, g, totales = u[orden], g[orden], totales[orden]
+
+    # Posición dentro del grupo de cada usuario
+    inicio = np.r_[True, u[1:] != u[:-1]][:len(u)]
+    primera = np.maximum.accumulate(np.where(inicio, np.arange(len(u)), 0))
+    keep = (np.arange(len(u)) - primera) < top
+    u, g, totales = u[keep], g[keep], totales[keep]
+
+    piezas = pc.binary_join_element_wise(
+        genres.take(pa.array(g)), pa.array(totales).cast(pa.string()), ':'
+    )
+    inicios = np.flatnonzero(np.r_[True, u[1:] != u[:-1]][:len(u)])
+    offsets = pa.array(np.r_[inicios, len(u)].astype(np.int32))
+    return ordenar_por(pa.table({
+        'user_id': users.take(pa.array(u[inicios])),
+        'top_genres': pc.binary_join(pa.ListArray.from_arrays(offsets, piezas), ','),
+    }), 'user_id'), int((~ok).sum())
+
+
+def decade_stats(music):
+    """Job 9: cantidad de canciones y promedios de features por década"""
+    features = ['danceability', 'energy', 'tempo', 'valence']
+    valores = [music.column(f).to_numpy(zero_copy_only=False) for f in features]
+    ok = np.logical_and.reduce([
+        music.column(f).is_valid().to_numpy(zero_copy_only=False) for f in features
+    ])
+
+    year = music.column('year').fill_null(0).to_numpy()
+    decade = np.searchsorted(DECADE_BINS, year, side='right')
+    decade[year == 0] = len(DECADE_LABELS) - 1
+    decade = decade[ok]
+
+    n = len(DECADE_LABELS)
+    count = np.bincount(decade, minlength=n)
+    sumas = [np.bincount(decade, weights=v[ok], minlength=n) for v in valores]
+    presentes = np.flatnonzero(count)
+
+    # round() de Python sobre <= 9 valores, como en el reducer
+    medias = {
+        f"avg_{f}": [round(s[d] / count[d], 2 if f == 'tempo' else 3) for d in presentes]
+        for f, s in zip(features, sumas)
+    }
+    return ordenar_por(pa.table({
+        'decade': [DECADE_LABELS[d] for d in presentes],
+        'song_count': pa.array(count[presentes]),
+        **medias,
+    }), 'decade'), int((~ok).sum())
+
+
+def user_activity(user_codes, users, plays):
+    """Job 10: canciones, plays y tipo de usuario"""
+    ok = (user_codes >= 0) & (plays >= 0)
+    n = len(users)
+    songs = np.bincount(user_codes[ok], minlength=n)
+    totales = np.rint(np.bincount(user_codes[ok], weights=plays[ok], minlength=n)).astype(np.int64)
+    activos = np.flatnonzero(songs)
+
+    tipo = np.searchsorted(USER_TYPE_BINS, songs[activos], side='right')
+    return ordenar_por(pa.table({
+        'user_id': users.take(pa.array(activos)),
+        'total_songs': pa.array(songs[activos]),
+        'total_plays': pa.array(totales[activos]),
+        'user_type': pa.array(USER_TYPE_LABELS).take(pa.array(tipo)),
+    }), 'user_id'), int((~ok).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jobs 7-10 en modo columnar (Arrow/NumPy)")
+    parser.add_argument('--listening', required=True, help="Carpeta Parquet de listening_clean")
+    parser.add_argument('--music', required=True, help="Carpeta Parquet de music_clean")
+    parser.add_argument('--output-dir', required=True, help="Raíz de salida (p.ej. ../frontend/data)")
+    parser.add_argument('--jobs', default='7,8,9,10', help="Subconjunto de jobs, p.ej. 7,10")
+    args = parser.parse_args()
+
+    jobs = args.jobs.split(',')
+    for job in jobs:
+        if job not in SALIDAS:
+            parser.error(f"job desconocido: {job}")
+
+    print("=" * 80)
+    print(f"INICIANDO JOBS {', '.join(jobs)} (COLUMNAR)")
+    print("=" * 80)
+
+    inicio = time.time()
+    music = ds.dataset(args.music, format='parquet').to_table(
+        columns=['track_id', 'artist', 'genre', 'year', 'danceability', 'energy', 'tempo', 'valence']
+    )
+    print(f"\n✓ music_clean: {music.num_rows:,} canciones")
+
+    resultados = {}
+    if jobs != ['9']:
+        listening = ds.dataset(args.listening, format='parquet').to_table(
+            columns=['user_id', 'track_id', 'total_playcount']
+        )
+        print(f"✓ listening_clean: {listening.num_rows:,} escuchas")
+
+        # Nulos -> -1 para que caigan en los filtros de cada job
+        plays = listening.column('total_playcount').fill_null(-1).to_numpy().astype(np.int64)
+        needs_tracks = '7' in jobs or '8' in jobs
+        needs_users = '8' in jobs or '10' in jobs
+        if needs_tracks:
+            # Join con music_clean: posición de la canción (-1 si no está)
+            track_pos = pc.index_in(
+                listening.column('track_id'), value_set=music.column('track_id')
+            ).fill_null(-1).to_numpy().astype(np.int64)
+        if needs_users:
+            user_codes, users = codificar(listening.column('user_id'))
+        print(f"✓ Claves codificadas en {time.time() - inicio:.1f}s")
+
+        if '7' in jobs:
+            resultados['7'] = artist_plays(track_pos, plays, music)
+        if '8' in jobs:
+            resultados['8'] = user_genres(user_codes, users, track_pos, plays, music)
+        if '10' in jobs:
+            resultados['10'] = user_activity(user_codes, users, plays)
+    if '9' in jobs:
+        resultados['9'] = decade_stats(music)
+
+    print()
+    for job in jobs:
+        table, descartadas = resultados[job]
+        escribir_tabla(table, os.path.join(args.output_dir, SALIDAS[job]))
+        print(f"✓ Job {job}: {table.num_rows:,} filas -> {SALIDAS[job]} ({descartadas:,} descartadas)")
+
+    print("\n" + "=" * 80)
+    print(f"COMPLETADO EN {time.time() - inicio:.1f}s")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,23 +4,38 @@
 JOB 7: CONTEO DE PLAYS POR ARTISTA - MAPPER
 ============================================================================
 Input: TSV con campos: user_id, track_id, playcount, artist
-Output: artist \t playcount
+Output: artist \t playcount (sumado por artista dentro de cada mapper)
+============================================================================
+Hadoop streaming:
+    -files streaming_runtime.py,job7_artist_plays_mapper.py,job7_artist_plays_reducer.py
+    -mapper job7_artist_plays_mapper.py
+    -combiner job7_artist_plays_reducer.py
+    -reducer job7_artist_plays_reducer.py
 ============================================================================
 """
-import sys
+from streaming_runtime import Combinador, ejecutar, minusculas, registros
+
 
-for line in sys.stdin:
-    line = line.strip()
-    if not line:
-        continue
+def procesar(salida, contadores):
+    combinador = Combinador(salida, lambda artist, plays: b'%s\t%d' % (artist, plays))
+    partial_plays = combinador.parciales
 
-    try:
-        fields = line.split('\t')
-        if len(fields) >= 4:
-            artist = fields[3].lower().strip()
+    for fields in registros(contadores, 4):
+        artist = minusculas(fields[3]).strip()
+        try:
             playcount = int(fields[2])
+        except ValueError:
+            contadores.sumar('malformed_playcount')
+            continue
+
+        if artist and artist != b'artist':
+            if artist in partial_plays:
+                partial_plays[artist] += playcount
+            else:
+                combinador.agregar(artist, playcount)
+
+    combinador.vaciar()
+
 
-            if artist and artist != 'artist':
-                print(f"{artist}\t{playcount}")
-    except Exception:
-        continue
+if __name__ == '__main__':
+    ejecutar(procesar, 'job7_mapper')
@@ -5,32 +5,15 @@ JOB 7: CONTEO DE PLAYS POR ARTISTA - REDUCER
 ============================================================================
 Input: artist \t playcount (sorted by artist)
 Output: artist \t total_plays
+Sirve también como -combiner: la salida tiene el mismo formato que la entrada.
 ============================================================================
 """
-import sys
+from streaming_runtime import reducir, suma
 
-current_artist = None
-total_plays = 0
 
-for line in sys.stdin:
-    line = line.strip()
-    if not line:
-        continue
+def emitir(salida, artist, total_plays):
+    salida.escribir(b'%s\t%d' % (artist, total_plays))
 
-    try:
-        artist, playcount = line.split('\t')
-        playcount = int(playcount)
 
-        if current_artist == artist:
-            total_plays += playcount
-        else:
-            if current_artist:
-                print(f"{current_artist}\t{total_plays}")
-            current_artist = artist
-            total_plays = playcount
-    except Exception:
-        continue
-
-# Don't forget last artist
-if current_artist:
-    print(f"{current_artist}\t{total_plays}")
+if __name__ == '__main__':
+    reducir('job7_reducer', suma(int), emitir)
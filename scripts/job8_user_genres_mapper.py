@@ -4,24 +4,40 @@
 JOB 8: GÉNEROS POR USUARIO - MAPPER
 ============================================================================
 Input: TSV con campos: user_id, genre, playcount
-Output: user_id \t genre:playcount
+Output: user_id \t genre:playcount (sumado por (usuario, género) dentro de cada mapper)
+============================================================================
+Hadoop streaming:
+    -files streaming_runtime.py,job8_user_genres_mapper.py,job8_user_genres_reducer.py
+    -mapper job8_user_genres_mapper.py
+    -combiner "job8_user_genres_reducer.py --combiner"
+    -reducer job8_user_genres_reducer.py
 ============================================================================
 """
-import sys
+from streaming_runtime import Combinador, ejecutar, minusculas, registros
+
 
-for line in sys.stdin:
-    line = line.strip()
-    if not line:
-        continue
+def procesar(salida, contadores):
+    combinador = Combinador(salida, lambda clave, plays: b'%s\t%s:%d' % (*clave, plays))
+    partial_plays = combinador.parciales
 
-    try:
-        fields = line.split('\t')
-        if len(fields) >= 3:
-            user_id = fields[0].strip()
-            genre = fields[1].strip().lower()
+    for fields in registros(contadores, 3):
+        user_id = fields[0].strip()
+        genre = minusculas(fields[1].strip())
+        try:
             playcount = int(fields[2])
+        except ValueError:
+            contadores.sumar('malformed_playcount')
+            continue
+
+        if user_id and genre and genre != b'unknown':
+            key = (user_id, genre)
+            if key in partial_plays:
+                partial_plays[key] += playcount
+            else:
+                combinador.agregar(key, playcount)
+
+    combinador.vaciar()
+
 
-            if user_id and genre and genre != 'unknown':
-                print(f"{user_id}\t{genre}:{playcount}")
-    except Exception:
-        continue
+if __name__ == '__main__':
+    ejecutar(procesar, 'job8_mapper')
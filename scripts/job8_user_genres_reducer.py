@@ -5,42 +5,29 @@ JOB 8: GÉNEROS POR USUARIO - REDUCER
 ============================================================================
 Input: user_id \t genre:playcount (sorted by user_id)
 Output: user_id \t top_genre1,top_genre2,top_genre3
+Con --combiner emite user_id \t genre:playcount por cada género (sumas
+parciales, mismo formato que la entrada) en vez del top 3.
 ============================================================================
 """
 import sys
-from collections import defaultdict
-
-current_user = None
-genre_plays = defaultdict(int)
-
-def output_top_genres(user_id, genres_dict):
-    """Output top 3 genres for user"""
-    sorted_genres = sorted(genres_dict.items(), key=lambda x: x[1], reverse=True)
-    top_3 = sorted_genres[:3]
-    genres_str = ','.join([f"{g}:{p}" for g, p in top_3])
-    print(f"{user_id}\t{genres_str}")
-
-for line in sys.stdin:
-    line = line.strip()
-    if not line:
-        continue
-
-    try:
-        user_id, genre_play = line.split('\t')
-        genre, playcount = genre_play.split(':')
-        playcount = int(playcount)
-
-        if current_user == user_id:
-            genre_plays[genre] += playcount
-        else:
-            if current_user:
-                output_top_genres(current_user, genre_plays)
-            current_user = user_id
-            genre_plays = defaultdict(int)
-            genre_plays[genre] = playcount
-    except Exception:
-        continue
-
-# Don't forget last user
-if current_user:
-    output_top_genres(current_user, genre_plays)
+
+from streaming_runtime import reducir, suma_por_subclave, top_k
+
+COMBINER = '--combiner' in sys.argv[1:]
+
+
+def emitir_sumas(salida, user_id, genre_plays):
+    for g, p in genre_plays.items():
+        salida.escribir(b'%s\t%s:%d' % (user_id, g, p))
+
+
+def emitir_top(salida, user_id, top_genres):
+    genres_str = b','.join([b'%s:%d' % (g, p) for g, p in top_genres])
+    salida.escribir(b'%s\t%s' % (user_id, genres_str))
+
+
+if __name__ == '__main__':
+    if COMBINER:
+        reducir('job8_combiner', suma_por_subclave(int), emitir_sumas)
+    else:
+        reducir('job8_reducer', top_k(3, suma_por_subclave(int)), emitir_top)
@@ -4,51 +4,72 @@
 JOB 9: ESTADÍSTICAS POR DÉCADA - MAPPER
 ============================================================================
 Input: TSV: year, danceability, energy, tempo, valence
-Output: decade \t song_count:1,sum_dance:X,sum_energy:Y,sum_tempo:Z,sum_valence:W
+Output: decade \t song_count,sum_dance,sum_energy,sum_tempo,sum_valence
+        (sumado por década dentro de cada mapper: a lo sumo 9 líneas por mapper)
+============================================================================
+Hadoop streaming:
+    -files streaming_runtime.py,job9_decade_stats_mapper.py,job9_decade_stats_reducer.py
+    -mapper job9_decade_stats_mapper.py
+    -combiner "job9_decade_stats_reducer.py --combiner"
+    -reducer job9_decade_stats_reducer.py
 ============================================================================
 """
-import sys
+from streaming_runtime import Combinador, ejecutar, registros
+
 
 def get_decade(year):
     """Convert year to decade"""
     try:
         y = int(year)
         if y == 0:
-            return "Unknown"
+            return b"Unknown"
         elif y < 1950:
-            return "Pre-1950"
+            return b"Pre-1950"
         elif y < 1960:
-            return "1950s"
+            return b"1950s"
         elif y < 1970:
-            return "1960s"
+            return b"1960s"
         elif y < 1980:
-            return "1970s"
+            return b"1970s"
         elif y < 1990:
-            return "1980s"
+            return b"1980s"
         elif y < 2000:
-            return "1990s"
+            return b"1990s"
         elif y < 2010:
-            return "2000s"
+            return b"2000s"
         else:
-            return "2010s+"
-    except:
-        return "Unknown"
+            return b"2010s+"
+    except ValueError:
+        return b"Unknown"
 
-for line in sys.stdin:
-    line = line.strip()
-    if not line:
-        continue
 
-    try:
-        fields = line.split('\t')
-        if len(fields) >= 5:
-            year = fields[0]
+def procesar(salida, contadores):
+    combinador = Combinador(salida, lambda decade, stats: b'%s\t%d,%r,%r,%r,%r' % (decade, *stats))
+    partial_stats = combinador.parciales
+
+    for fields in registros(contadores, 5):
+        try:
             danceability = float(fields[1]) if fields[1] else 0
             energy = float(fields[2]) if fields[2] else 0
             tempo = float(fields[3]) if fields[3] else 0
             valence = float(fields[4]) if fields[4] else 0
+        except ValueError:
+            contadores.sumar('malformed_feature')
+            continue
+
+        decade = get_decade(fields[0])
+        stats = partial_stats.get(decade)
+        if stats is None:
+            combinador.agregar(decade, [1, danceability, energy, tempo, valence])
+        else:
+            stats[0] += 1
+            stats[1] += danceability
+            stats[2] += energy
+            stats[3] += tempo
+            stats[4] += valence
+
+    combinador.vaciar()
+
 
-            decade = get_decade(year)
-            print(f"{decade}\t1,{danceability},{energy},{tempo},{valence}")
-    except Exception:
-        continue
+if __name__ == '__main__':
+    ejecutar(procesar, 'job9_mapper')
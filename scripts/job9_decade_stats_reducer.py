@@ -5,59 +5,33 @@ JOB 9: ESTADÍSTICAS POR DÉCADA - REDUCER
 ============================================================================
 Input: decade \t count,danceability,energy,tempo,valence (sorted by decade)
 Output: decade \t count,avg_dance,avg_energy,avg_tempo,avg_valence
+Con --combiner emite decade \t count,sum_dance,sum_energy,sum_tempo,sum_valence
+(sumas parciales, mismo formato que la entrada) en vez de los promedios.
 ============================================================================
 """
 import sys
 
-current_decade = None
-total_count = 0
-sum_dance = 0.0
-sum_energy = 0.0
-sum_tempo = 0.0
-sum_valence = 0.0
-
-def output_stats(decade, count, dance, energy, tempo, valence):
-    """Output average statistics"""
-    if count > 0:
-        avg_dance = round(dance / count, 3)
-        avg_energy = round(energy / count, 3)
-        avg_tempo = round(tempo / count, 2)
-        avg_valence = round(valence / count, 3)
-        print(f"{decade}\t{count}\t{avg_dance}\t{avg_energy}\t{avg_tempo}\t{avg_valence}")
-
-for line in sys.stdin:
-    line = line.strip()
-    if not line:
-        continue
-
-    try:
-        decade, values = line.split('\t')
-        count, dance, energy, tempo, valence = values.split(',')
-
-        count = int(count)
-        dance = float(dance)
-        energy = float(energy)
-        tempo = float(tempo)
-        valence = float(valence)
-
-        if current_decade == decade:
-            total_count += count
-            sum_dance += dance
-            sum_energy += energy
-            sum_tempo += tempo
-            sum_valence += valence
-        else:
-            if current_decade:
-                output_stats(current_decade, total_count, sum_dance, sum_energy, sum_tempo, sum_valence)
-            current_decade = decade
-            total_count = count
-            sum_dance = dance
-            sum_energy = energy
-            sum_tempo = tempo
-            sum_valence = valence
-    except Exception:
-        continue
-
-# Don't forget last decade
-if current_decade:
-    output_stats(current_decade, total_count, sum_dance, sum_energy, sum_tempo, sum_valence)
+from streaming_runtime import media_vector, reducir, suma_vector
+
+COMBINER = '--combiner' in sys.argv[1:]
+
+# count, sum_dance, sum_energy, sum_tempo, sum_valence
+TIPOS = (int, float, float, float, float)
+
+
+def emitir_sumas(salida, decade, sumas):
+    salida.escribir(b'%s\t%d,%r,%r,%r,%r' % (decade, *sumas))
+
+
+def emitir_medias(salida, decade, stats):
+    count, (dance, energy, tempo, valence) = stats
+    salida.escribir(b'%s\t%d\t%r\t%r\t%r\t%r' % (
+        decade, count, round(dance, 3), round(energy, 3), round(tempo, 2), round(valence, 3)
+    ))
+
+
+if __name__ == '__main__':
+    if COMBINER:
+        reducir('job9_combiner', suma_vector(TIPOS), emitir_sumas)
+    else:
+        reducir('job9_reducer', media_vector(TIPOS), emitir_medias)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+RUNNER LOCAL DE MAPREDUCE (JOBS 7-10) CON SHUFFLE POR ORDENAMIENTO
+============================================================================
+Input: carpeta con partes TSV (lo que deja job7_10_prepare_all.hql en S3)
+Output: carpeta con part-00000..part-N y _SUCCESS, igual que Hadoop
+        (la consume convert_parquet_to_json.py:convert_mapreduce_output)
+============================================================================
+Fases, cada una con un proceso por core:
+1. Map: cada split (parte o trozo de ~--split-mb alineado a líneas) pasa por
+   el mapper; su salida se reparte por hash de la clave (crc32, estable entre
+   procesos) en N particiones, ordenadas en memoria y volcadas a disco
+   (runs) cada --spill-mb. Con combiner, cada run ordenado pasa por él.
+2. Reduce: la partición r junta todos sus runs con un merge externo
+   (heapq.merge, memoria constante) y los entrega ordenados al reducer.
+Los contadores reporter:counter de los scripts se suman y se muestran al final.
+
+Uso:
+    python mapreduce_local.py --job 10 --input data/mapreduce/job10_input
+    python mapreduce_local.py --input in/ --output out/ --mapper m.py --reducer r.py --combiner "r.py --combiner"
+============================================================================
+"""
+import argparse
+import heapq
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_ROOT = os.path.join(SCRIPTS_DIR, '..', 'frontend', 'data')
+
+# job -> (mapper, combiner, reducer, carpeta de salida bajo frontend/data)
+JOBS = {
+    '7': ('job7_artist_plays_mapper.py', 'job7_artist_plays_reducer.py',
+          'job7_artist_plays_reducer.py', 'job7_artist_plays'),
+    '8': ('job8_user_genres_mapper.py', 'job8_user_genres_reducer.py --combiner',
+          'job8_user_genres_reducer.py', 'job8_user_genres'),
+    '9': ('job9_decade_stats_mapper.py', 'job9_decade_stats_reducer.py --combiner',
+          'job9_decade_stats_reducer.py', 'job9_decade_stats'),
+    '10': ('job10_user_activity_mapper.py', 'job10_user_activity_reducer.py --combiner',
+           'job10_user_activity_reducer.py', 'job10_user_activity'),
+}
+
+COPY_SIZE = 1 << 20
+
+
+# ============================================================================
+# UTILIDADES
+# ============================================================================
+
+def comando(script):
+    """'script.py --flag' -> [python, ruta/script.py, --flag] (rutas relativas a scripts/)"""
+    partes = shlex.split(script)
+    ruta = partes[0] if os.path.isabs(partes[0]) else os.path.join(SCRIPTS_DIR, partes[0])
+    return [sys.executable, ruta] + partes[1:]
+
+
+def clave(linea):
+    """Clave de una línea de salida (hasta el primer tab), como Hadoop streaming"""
+    return linea.split(b'\t', 1)[0]
+
+
+def sumar_contadores(stderr, contadores):
+    """Suma las líneas reporter:counter:grupo,nombre,cantidad y devuelve el resto"""
+    resto = []
+    for linea in stderr.decode('utf-8', 'replace').splitlines():
+        if linea.startswith('reporter:counter:'):
+            grupo, nombre, cantidad = linea[len('reporter:counter:'):].rsplit(',', 2)
+            contadores[f"{grupo}.{nombre}"] += int(cantidad)
+        elif linea.strip():
+            resto.append(linea)
+    return resto
+
+
+def ejecutar_script(cmd, alimentar, consumir):
+    """
+    Corre cmd con alimentar(stdin) en un hilo y consumir(stdout) en el actual
+    (sin deadlock con salidas grandes). Devuelve el stderr.
+    """
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    errores = []
+    lector_err = threading.Thread(target=lambda: errores.append(proc.stderr.read()))
+    lector_err.start()
+
+    def escribir():
+        try:
+            alimentar(proc.stdin)
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    escritor = threading.Thread(target=escribir)
+    escritor.start()
+    consumir(proc.stdout)
+    escritor.join()
+    lector_err.join()
+    if proc.wait() != 0:
+        raise RuntimeError(f"{' '.join(cmd)} terminó con código {proc.returncode}:\n"
+                           f"{errores[0].decode('utf-8', 'replace')}")
+    return errores[0]
+
+
+# ============================================================================
+# SPLITS
+# ============================================================================
+
+def calcular_splits(input_dir, split_bytes):
+    """(archivo, inicio, fin) por parte de entrada, partiendo las grandes"""
+    splits = []
+    for nombre in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, nombre)
+        if nombre.startswith(('.', '_')) or not os.path.isfile(path):
+            continue
+        tamano = os.path.getsize(path)
+        for inicio in range(0, max(tamano, 1), split_bytes):
+            splits.append((path, inicio, min(inicio + split_bytes, tamano)))
+    return splits
+
+
+def copiar_split(path, inicio, fin, destino):
+    """
+    Copia las líneas del split como LineRecordReader: si inicio > 0 se salta
+    la línea parcial (la lee el split anterior) y se sigue hasta terminar la
+    línea que cruza fin.
+    """
+    with open(path, 'rb') as f:
+        if inicio > 0:
+            f.seek(inicio - 1)
+            f.readline()
+        pos = f.tell()
+        while pos < fin:
+            bloque = f.read(min(COPY_SIZE, fin - pos))
+            if not bloque:
+                return
+            destino.write(bloque)
+            pos += len(bloque)
+        # Completar la última línea
+        if pos == fin and fin > 0:
+            f.seek(fin - 1)
+            if f.read(1) != b'\n':
+                destino.write(f.readline())
+
+
+# ============================================================================
+# MAP
+# ============================================================================
+
+def volcar_run(lineas, path, combiner):
+    """Ordena las líneas por clave y las escribe (pasando por el combiner si hay)"""
+    lineas.sort(key=clave)
+    if combiner is None:
+        with open(path, 'wb') as f:
+            f.writelines(lineas)
+        return b''
+
+    combinadas = []
+    stderr = ejecutar_script(
+        combiner,
+        lambda stdin: stdin.writelines(lineas),
+        lambda stdout: combinadas.extend(stdout)
+    )
+    combinadas.sort(key=clave)
+    with open(path, 'wb') as f:
+        f.writelines(combinadas)
+    return stderr
+
+
+def tarea_map(indice, split, mapper, combiner, num_reducers, spill_bytes, tmp_dir):
+    """Corre el mapper sobre un split y deja runs ordenados por partición"""
+    path, inicio, fin = split
+    particiones = [[] for _ in range(num_reducers)]
+    estado = {'bytes': 0, 'run': 0, 'runs': [[] for _ in range(num_reducers)], 'stderr': []}
+
+    def volcar():
+        for r, lineas in enumerate(particiones):
+            if lineas:
+                run_path = os.path.join(tmp_dir, f"map-{indice:05d}-r{r:05d}-{estado['run']:04d}")
+                estado['stderr'].append(volcar_run(lineas, run_path, combiner))
+                estado['runs'][r].append(run_path)
+                particiones[r] = []
+        estado['run'] += 1
+        estado['bytes'] = 0
+
+    def consumir(stdout):
+        for linea in stdout:
+            if not linea.endswith(b'\n'):
+                linea += b'\n'
+            particiones[zlib.crc32(clave(linea)) % num_reducers].append(linea)
+            estado['bytes'] += len(linea)
+            if estado['bytes'] >= spill_bytes:
+                volcar()
+
+    stderr = ejecutar_script(mapper, lambda stdin: copiar_split(path, inicio, fin, stdin), consumir)
+    volcar()
+    return estado['runs'], [stderr] + estado['stderr']
+
+
+# ============================================================================
+# REDUCE
+# ============================================================================
+
+def tarea_reduce(r, runs, reducer, output_dir):
+    """Merge externo de los runs de la partición r -> reducer -> part-r"""
+    archivos = [open(p, 'rb') for p in runs]
+    try:
+        with open(os.path.join(output_dir, f"part-{r:05d}"), 'wb') as salida:
+            stderr = ejecutar_script(
+                reducer,
+                lambda stdin: stdin.writelines(heapq.merge(*archivos, key=clave)),
+                lambda stdout: shutil.copyfileobj(stdout, salida, COPY_SIZE)
+            )
+    finally:
+        for f in archivos:
+            f.close()
+    return stderr
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MapReduce local multiproceso para los jobs 7-10")
+    parser.add_argument('--job', choices=sorted(JOBS), default=None, help="Usa los scripts del job 7/8/9/10")
+    parser.add_argument('--input', required=True, help="Carpeta con las partes TSV de entrada")
+    parser.add_argument('--output', default=None, help="Por defecto ../frontend/data/jobN_...")
+    parser.add_argument('--mapper', default=None)
+    parser.add_argument('--combiner', default=None)
+    parser.add_argument('--reducer', default=None)
+    parser.add_argument('--no-combiner', action='store_true')
+    parser.add_argument('--mappers', type=int, default=os.cpu_count())
+    parser.add_argument('--reducers', type=int, default=os.cpu_count())
+    parser.add_argument('--split-mb', type=int, default=128)
+    parser.add_argument('--spill-mb', type=int, default=64)
+    parser.add_argument('--tmp-dir', default=None)
+    args = parser.parse_args()
+
+    mapper, combiner, reducer, salida = JOBS[args.job] if args.job else (None, None, None, None)
+    mapper = args.mapper or mapper
+    combiner = None if args.no_combiner else (args.combiner or combiner)
+    reducer = args.reducer or reducer
+    output_dir = args.output or (os.path.join(OUTPUT_ROOT, salida) if salida else None)
+    if not (mapper and reducer and output_dir):
+        parser.error("indicar --job o bien --mapper, --reducer y --output")
+
+    mapper, reducer = comando(mapper), comando(reducer)
+    combiner = comando(combiner) if combiner else None
+
+    print("=" * 80)
+    print(f"MAPREDUCE LOCAL: {os.path.basename(mapper[1])} -> {os.path.basename(reducer[1])}")
+    print("=" * 80)
+
+    inicio = time.time()
+    splits = calcular_splits(args.input, args.split_mb << 20)
+    print(f"\n📂 {len(splits)} splits, {args.mappers} mappers, {args.reducers} reducers"
+          f"{' (con combiner)' if combiner else ''}")
+
+    contadores = Counter()
+    tmp_dir = tempfile.mkdtemp(prefix='mapreduce-', dir=args.tmp_dir)
+    try:
+        # Map + shuffle a disco
+        runs = [[] for _ in range(args.reducers)]
+        with ProcessPoolExecutor(max_workers=args.mappers) as pool:
+            futuros = [
+                pool.submit(tarea_map, i, split, mapper, combiner, args.reducers, args.spill_mb << 20, tmp_dir)
+                for i, split in enumerate(splits)
+            ]
+            for futuro in futuros:
+                runs_split, stderrs = futuro.result()
+                for r, paths in enumerate(runs_split):
+                    runs[r].extend(paths)
+                for stderr in stderrs:
+                    for linea in sumar_contadores(stderr, contadores):
+                        print(f"   [map] {linea}")
+        print(f"✓ Map: {sum(len(r) for r in runs):,} runs ordenados en {time.time() - inicio:.1f}s")
+
+        # Reduce
+        if os.path.exists(output_dir):
+            shutil.rmtree(output_dir)
+        os.makedirs(output_dir)
+        with ProcessPoolExecutor(max_workers=args.reducers) as pool:
+            futuros = [
+                pool.submit(tarea_reduce, r, runs[r], reducer, output_dir)
+                for r in range(args.reducers)
+            ]
+            for futuro in futuros:
+                for linea in sumar_contadores(futuro.result(), contadores):
+                    print(f"   [reduce] {linea}")
+        open(os.path.join(output_dir, '_SUCCESS'), 'w').close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"✓ Reduce: {args.reducers} partes en {output_dir}")
+    if contadores:
+        print("\n📊 Contadores:")
+        for nombre, cantidad in sorted(contadores.items()):
+            print(f"   {nombre}: {cantidad:,}")
+
+    print("\n" + "=" * 80)
+    print(f"COMPLETADO EN {time.time() - inicio:.1f}s")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+MÉTRICAS DE RANKING PARA LAS RECOMENDACIONES TOP-K (NumPy, sin Spark)
+============================================================================
+Input: listas top-K por usuario + interacciones de test en CSR
+Output: precision@K, recall@K, NDCG@K, MAP@K y cobertura del catálogo
+============================================================================
+Mismas definiciones que pyspark.mllib.evaluation.RankingMetrics (la versión
+que usa el Job 5 en el cluster): relevantes = items de test del usuario,
+recall@K divide por |relevantes|, MAP@K por min(|relevantes|, K). Solo se
+evalúan usuarios con al menos un item de test.
+
+Todo se calcula en una pasada vectorizada: cada par (usuario, item) se
+codifica como user * num_items + item y la pertenencia a test es un
+searchsorted sobre las claves de test ordenadas.
+============================================================================
+"""
+import numpy as np
+
+
+def matriz_aciertos(top_items, users, test_indptr, test_indices, num_items):
+    """Matriz booleana (len(users), K): True si el item recomendado está en test"""
+    top_items = np.asarray(top_items, dtype=np.int64)
+    users = np.asarray(users, dtype=np.int64)
+    test_users = np.repeat(np.arange(len(test_indptr) - 1, dtype=np.int64), np.diff(test_indptr))
+    claves_test = np.sort(test_users * num_items + np.asarray(test_indices, dtype=np.int64))
+
+    claves = users[:, None] * num_items + top_items
+    pos = np.searchsorted(claves_test, claves)
+    pos[pos == len(claves_test)] = 0
+    if len(claves_test) == 0:
+        return np.zeros(claves.shape, dtype=bool)
+    # Ítems en -1 / relleno nunca aciertan
+    return (claves_test[pos] == claves) & (top_items >= 0)
+
+
+def metricas_ranking(top_items, users, test_indptr, test_indices, num_items, num_recomendables=None):
+    """
+    top_items: (len(users), K) items recomendados por usuario, ordenados por score
+    users: índices de usuario de cada fila de top_items
+    test_indptr, test_indices: CSR usuarios x items de test (ver als_topk.csr_desde_pares)
+    num_recomendables: items que el modelo puede recomendar (los que tienen
+        factores), denominador de catalog_coverage; por defecto num_items.
+        El Job 5 en Spark divide por model.itemFactors.count(), que es lo mismo.
+    Devuelve un dict {nombre_metrica: valor}.
+    """
+    top_items = np.atleast_2d(np.asarray(top_items, dtype=np.int64))
+    users = np.asarray(users, dtype=np.int64)
+    k = top_items.shape[1]
+
+    n_relevantes = np.diff(test_indptr)[users]
+    evaluables = n_relevantes > 0
+    aciertos = matriz_aciertos(top_items, users, test_indptr, test_indices, num_items)[evaluables]
+    n_relevantes = n_relevantes[evaluables]
+
+    nombres = [f'precision@{k}', f'recall@{k}', f'ndcg@{k}', f'map@{k}']
+    if len(n_relevantes) == 0:
+        resultado = dict.fromkeys(nombres, float('nan'))
+    else:
+        por_usuario = aciertos.sum(axis=1)
+        descuento = 1.0 / np.log2(np.arange(2, k + 2))
+        dcg = (aciertos * descuento).sum(axis=1)
+        # DCG ideal: todos los relevantes (hasta K) en las primeras posiciones
+        idcg = np.cumsum(descuento)[np.minimum(n_relevantes, k) - 1]
+        # Precisión en cada posición con acierto (promedio = AP@K)
+        precision_en = np.cumsum(aciertos, axis=1) / np.arange(1, k + 1)
+        ap = (precision_en * aciertos).sum(axis=1) / np.minimum(n_relevantes, k)
+
+        resultado = dict(zip(nombres, [
+            float(np.mean(por_usuario / k)),
+            float(np.mean(por_usuario / n_relevantes)),
+            float(np.mean(dcg / idcg)),
+            float(np.mean(ap)),
+        ]))
+
+    recomendados = np.unique(top_items[top_items >= 0])
+    if num_recomendables is None:
+        num_recomendables = num_items
+    resultado['catalog_coverage'] = len(recomendados) / num_recomendables if num_recomendables else float('nan')
+    resultado['users_evaluated'] = int(evaluables.sum())
+    return resultado
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+JOBS 2-4 Y 6 (MODO LOCAL): LOS .hql SOBRE PARQUET LOCAL CON DUCKDB
+============================================================================
+Objetivo: Correr limpieza, exploratorio, tendencias y charts sin Hive/EMR
+Input: carpeta local con el mismo layout que s3://emr-logs-1758750407/music-data/
+       (raw-parquet/{music,listening} para el Job 2, cleaned/... para el resto)
+Output: las tablas de cada CREATE TABLE ... LOCATION en la carpeta local
+        equivalente (cleaned/, analysis/, trends/, charts/), como
+        part-00000.snappy.parquet + _SUCCESS
+============================================================================
+No hay una segunda implementación de las consultas: se ejecutan los mismos
+.hql, sentencia por sentencia, traduciendo lo propio de Hive:
+- SET ... / ADD JAR ...                    -> se ignora
+- CREATE TEMPORARY FUNCTION f AS 'clase'   -> macro DuckDB equivalente (FUNCIONES_HIVE)
+- CREATE EXTERNAL TABLE t (...) LOCATION   -> vista sobre los part files locales
+                                              (subcarpetas col=valor si es PARTITIONED BY)
+- MSCK REPAIR TABLE t                      -> vuelve a listar las particiones
+- CREATE TABLE t ... LOCATION ... AS SELECT -> tabla DuckDB + export a Parquet
+- CREATE TABLE t (...) ... LOCATION + INSERT OVERWRITE TABLE t [PARTITION (p)]
+                                           -> export ordenado por SORT BY/SORTED BY,
+                                              reescribiendo solo las particiones que
+                                              produce la consulta (dynamic partitions)
+                                              o la indicada (p='valor'), aunque quede vacía
+- INSERT INTO TABLE t ...                  -> part file adicional en la carpeta
+- FROM (...) x INSERT ... INSERT ...       -> multi-insert: la fuente se materializa una
+                                              vez y cada INSERT lee de esa copia
+- DROP TABLE IF EXISTS t                   -> DROP de la tabla o vista
+- SELECT de verificación                   -> se imprime (o se salta con --skip-reports)
+Las tablas de jobs anteriores se registran desde disco, así que cada job se
+puede correr por separado (p.ej. --jobs 4 sobre un cleaned/ descargado de S3).
+Las variables ${hivevar:x} se reemplazan con --hivevar x=valor, como en hive -f.
+
+Uso:
+    python pipeline_local.py --data-dir ../frontend/data
+    python pipeline_local.py --data-dir ../frontend/data --jobs 3,4 --skip-reports
+    python pipeline_local.py --data-dir ../frontend/data --jobs 2i --hivevar dts_music="''" --hivevar dts_listening="'2026-10-18'"
+============================================================================
+"""
+import argparse
+import os
+import re
+import shutil
+import time
+
+try:
+    import duckdb
+except ImportError:  # opcional: solo lo necesita este runner
+    duckdb = None
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+S3_ROOT = 's3://emr-logs-1758750407/music-data/'
+
+JOBS = {
+    '2': 'job2_limpieza_completo.hql',
+    '2i': 'job2_incremental.hql',
+    '3': 'job3_analisis_exploratorio.hql',
+    '4': 'job4_descubrimiento_tendencias.hql',
+    '6': 'job6_top_charts.hql',
+}
+
+# Tablas que los jobs 3, 4 y 6 esperan encontrar en el metastore
+TABLAS_BASE = {
+    'music_clean': 'cleaned/music',
+    'listening_clean': 'cleaned/listening',
+    'music_with_stats': 'cleaned/music_with_stats',
+    'track_stats': 'cleaned/track_stats',
+}
+
+# Los sketches HLL locales son la lista exacta de oyentes (ver FUNCIONES_HIVE)
+TIPOS_HIVE = {'STRING': 'VARCHAR', 'INT': 'INTEGER', 'BINARY': 'VARCHAR[]'}
+
+# UDFs de DataSketches -> macros DuckDB. En local el "sketch" es el conjunto
+# exacto (lista sin repetidos ni nulos), así que la estimación es exacta
+FUNCIONES_HIVE = {
+    'org.apache.datasketches.hive.hll.DataToSketchUDAF': 'list_distinct(list(x))',
+    'org.apache.datasketches.hive.hll.UnionSketchUDAF': 'list_distinct(flatten(list(x)))',
+    'org.apache.datasketches.hive.hll.SketchToEstimateUDF': 'CAST(len(x) AS DOUBLE)',
+}
+
+# INSERT OVERWRITE|INTO TABLE t [PARTITION (p | p='v')] consulta
+INSERT_RE = r"INSERT\s+(OVERWRITE|INTO)\s+TABLE\s+(\w+)(?:\s+PARTITION\s*\(([^)]*)\))?\s+(.*)$"
+
+# Filas máximas que se imprimen por SELECT de verificación
+MAX_FILAS_REPORTE = 50
+
+
+# ============================================================================
+# PARSEO DE .hql
+# ============================================================================
+
+def sentencias(texto):
+    """Parte un .hql en sentencias (por ';'), sin comentarios '--' fuera de strings"""
+    actual, resultado = [], []
+    comilla = None
+    i = 0
+    while i < len(texto):
+        c = texto[i]
+        if comilla:
+            actual.append(c)
+            if c == comilla:
+                comilla = None
+        elif c in ("'", '"'):
+            comilla = c
+            actual.append(c)
+        elif texto.startswith('--', i):
+            fin = texto.find('\n', i)
+            i = len(texto) if fin < 0 else fin
+            continue
+        elif c == ';':
+            resultado.append(''.join(actual).strip())
+            actual = []
+        else:
+            actual.append(c)
+        i += 1
+    resultado.append(''.join(actual).strip())
+    return [s for s in resultado if s]
+
+
+def columnas_row_number(consulta):
+    """Alias de las columnas ROW_NUMBER() OVER (...) AS x (INT en Hive, BIGINT en DuckDB)"""
+    alias = []
+    for m in re.finditer(r'ROW_NUMBER\(\)\s*OVER\s*\(', consulta, re.I):
+        nivel, i = 1, m.end()
+        while nivel and i < len(consulta):
+            nivel += {'(': 1, ')': -1}.get(consulta[i], 0)
+            i += 1
+        a = re.match(r'\s*AS\s+(\w+)', consulta[i:], re.I)
+        if a:
+            alias.append(a.group(1).lower())
+    return alias
+
+
+def columnas_particion(opciones):
+    """'PARTITIONED BY (decade STRING)' dentro de las opciones del DDL -> columnas"""
+    m = re.search(r'PARTITIONED\s+BY\s*\(([^)]*)\)', opciones, re.I)
+    return columnas_ddl(m.group(1)) if m else []
+
+
+def columnas_orden(opciones):
+    """'SORTED BY (user_id, track_id)' de un DDL con buckets -> ['user_id', 'track_id']"""
+    m = re.search(r'SORTED\s+BY\s*\(([^)]*)\)', opciones, re.I)
+    return [c.strip() for c in m.group(1).split(',')] if m else []
+
+
+def agregar_from(consulta, fuente):
+    """'SELECT a, b WHERE x' de un multi-insert -> 'SELECT a, b FROM fuente WHERE x'"""
+    nivel, comilla = 0, None
+    for i, c in enumerate(consulta):
+        if comilla:
+            if c == comilla:
+                comilla = None
+        elif c in ("'", '"'):
+            comilla = c
+        elif c in '()':
+            nivel += 1 if c == '(' else -1
+        elif nivel == 0 and re.match(
+            r'\s(WHERE|GROUP\s+BY|HAVING|ORDER\s+BY|SORT\s+BY|DISTRIBUTE\s+BY|LIMIT)\b', consulta[i:], re.I
+        ):
+            return f"{consulta[:i]} FROM {fuente}{consulta[i:]}"
+    return f"{consulta} FROM {fuente}"
+
+
+def columnas_ddl(definicion):
+    """'track_id STRING, year INT, ...' -> [('track_id', 'VARCHAR'), ('year', 'INTEGER'), ...]"""
+    columnas = []
+    for col in definicion.split(','):
+        nombre, tipo = col.split()[:2]
+        columnas.append((nombre, TIPOS_HIVE.get(tipo.upper(), tipo.upper())))
+    return columnas
+
+
+# ============================================================================
+# EJECUCIÓN
+# ============================================================================
+
+class PipelineLocal:
+    """Sesión DuckDB en memoria que hace de metastore + motor de los .hql"""
+
+    def __init__(self, data_dir, skip_reports=False, hivevars=None):
+        self.data_dir = data_dir
+        self.skip_reports = skip_reports
+        self.hivevars = hivevars or {}
+        self.con = duckdb.connect()
+        # Tablas con LOCATION conocida: nombre -> (folder, columnas, particiones, orden)
+        self.tablas = {}
+
+    def ruta_local(self, location):
+        """s3://emr-logs-1758750407/music-data/x/y/ -> data_dir/x/y"""
+        if not location.startswith(S3_ROOT):
+            raise ValueError(f"LOCATION fuera de {S3_ROOT}: {location}")
+        return os.path.join(self.data_dir, location[len(S3_ROOT):].strip('/'))
+
+    def eliminar(self, nombre):
+        """DROP TABLE IF EXISTS de Hive: borra la tabla o la vista con ese nombre"""
+        tipo = self.con.execute(
+            "SELECT table_type FROM information_schema.tables WHERE table_name = ?", [nombre]
+        ).fetchone()
+        if tipo:
+            self.con.execute(f"DROP {'VIEW' if tipo[0] == 'VIEW' else 'TABLE'} {nombre}")
+
+    def registrar_externa(self, nombre, folder, columnas=None, particiones=()):
+        """
+        Vista sobre los part files de la carpeta (Hive no les pone extensión).
+        Con particiones declaradas solo se leen las subcarpetas col=valor (y
+        sus valores son columnas más); sin DDL se detectan por el layout. Una
+        tabla sin PARTITIONED BY lee también las subcarpetas, como Hive con
+        mapreduce.input.fileinputformat.input.dir.recursive. La ruta de cada
+        archivo queda en INPUT__FILE__NAME, la columna virtual de Hive.
+        """
+        partes = listar_partes(folder)
+        if particiones:
+            partes = [p for p in partes if os.path.dirname(p) != folder]
+        self.eliminar(nombre)
+        if not partes:
+            if columnas is None:
+                return False
+            vacias = ', '.join(f"CAST(NULL AS {tipo}) AS {col}" for col, tipo in columnas)
+            self.con.execute(f"CREATE VIEW {nombre} AS SELECT {vacias} WHERE false")
+            return True
+
+        archivos = '[' + ', '.join("'" + p.replace("'", "''") + "'" for p in partes) + ']'
+        particionada = bool(particiones) or (
+            columnas is None and any(os.path.dirname(p) != folder for p in partes)
+        )
+        seleccion = '* EXCLUDE (filename)' if columnas is None else ', '.join(
+            f"CAST({col} AS {tipo}) AS {col}" for col, tipo in columnas
+        )
+        self.con.execute(
+            f"CREATE VIEW {nombre} AS SELECT {seleccion}, filename AS INPUT__FILE__NAME "
+            f"FROM read_parquet({archivos}, hive_partitioning = {str(particionada).lower()}, filename = true)"
+        )
+        return True
+
+    def exportar(self, nombre, folder, enteros=(), orden=(), particiones=(), valores=None, agregar=False):
+        """
+        Escribe la tabla en la carpeta con los tipos que dejaría Hive:
+        HUGEINT (SUM de INT) -> BIGINT, DECIMAL -> DOUBLE y 'enteros' -> INT.
+        Sin particiones reemplaza la carpeta; con particiones reemplaza solo
+        las subcarpetas col=valor presentes en la tabla, o las de 'valores'
+        (partición estática) aunque no tengan filas. Las columnas de
+        partición no se guardan en los archivos, como en Hive. Con 'agregar'
+        (INSERT INTO) no borra nada y escribe el siguiente part file.
+        """
+        columnas = self.con.execute(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_name = ? ORDER BY ordinal_position", [nombre]
+        ).fetchall()
+        seleccion = ', '.join(
+            f"CAST({col} AS INTEGER) AS {col}" if col.lower() in enteros
+            else f"CAST({col} AS BIGINT) AS {col}" if tipo == 'HUGEINT'
+            else f"CAST({col} AS DOUBLE) AS {col}" if tipo.startswith('DECIMAL')
+            else col
+            for col, tipo in columnas
+            if col.lower() not in particiones
+        )
+        order_by = f" ORDER BY {', '.join(orden)}" if orden else ''
+
+        if not particiones:
+            destinos = [(folder, '')]
+            if os.path.exists(folder) and not agregar:
+                shutil.rmtree(folder)
+        else:
+            if valores is None:
+                valores = self.con.execute(
+                    f"SELECT DISTINCT {', '.join(particiones)} FROM {nombre}"
+                ).fetchall()
+            destinos = []
+            for fila in valores:
+                subcarpeta = os.path.join(folder, *(f"{p}={v}" for p, v in zip(particiones, fila)))
+                condicion = ' AND '.join(
+                    f"{p} = '{str(v).replace(chr(39), chr(39) * 2)}'" for p, v in zip(particiones, fila)
+                )
+                destinos.append((subcarpeta, f" WHERE {condicion}"))
+                if os.path.exists(subcarpeta) and not agregar:
+                    shutil.rmtree(subcarpeta)
+
+        for carpeta, where in destinos:
+            os.makedirs(carpeta, exist_ok=True)
+            siguiente = sum(1 for f in os.listdir(carpeta) if f.startswith('part-'))
+            destino = os.path.join(carpeta, f'part-{siguiente:05d}.snappy.parquet').replace("'", "''")
+            self.con.execute(
+                f"COPY (SELECT {seleccion} FROM {nombre}{where}{order_by}) "
+                f"TO '{destino}' (FORMAT PARQUET, COMPRESSION SNAPPY)"
+            )
+        os.makedirs(folder, exist_ok=True)
+        open(os.path.join(folder, '_SUCCESS'), 'w').close()
+
+    def reporte(self, sql):
+        """SELECT de verificación: se imprime como el CLI de Hive (tab-separated)"""
+        if self.skip_reports:
+            return
+        resultado = self.con.execute(sql)
+        for fila in resultado.fetchmany(MAX_FILAS_REPORTE):
+            print('   ' + '\t'.join('NULL' if v is None else str(v) for v in fila))
+
+    def ejecutar(self, sentencia):
+        """Traduce y ejecuta una sentencia del .hql"""
+        s = sentencia.strip()
+        if re.match(r'(SET|ADD\s+JAR)\s', s, re.I):
+            return
+
+        m = re.match(r"CREATE\s+TEMPORARY\s+FUNCTION\s+(\w+)\s+AS\s+'([^']+)'$", s, re.I)
+        if m:
+            nombre, clase = m.groups()
+            if clase not in FUNCIONES_HIVE:
+                raise ValueError(f"UDF sin equivalente local: {clase}")
+            self.con.execute(f"CREATE OR REPLACE MACRO {nombre}(x) AS {FUNCIONES_HIVE[clase]}")
+            return
+
+        m = re.match(r'DROP\s+TABLE\s+IF\s+EXISTS\s+(\w+)$', s, re.I)
+        if m:
+            self.eliminar(m.group(1))
+            return
+
+        m = re.match(r'MSCK\s+REPAIR\s+TABLE\s+(\w+)$', s, re.I)
+        if m:
+            folder, columnas, particiones, _ = self.tablas[m.group(1)]
+            self.registrar_externa(m.group(1), folder, columnas, particiones)
+            return
+
+        # DDL sin AS SELECT (EXTERNAL, o tabla que se llena con INSERT OVERWRITE)
+        m = re.match(
+            r"CREATE\s+(EXTERNAL\s+)?TABLE\s+(IF\s+NOT\s+EXISTS\s+)?(\w+)\s*\((.*?)\)\s*(.*?)"
+            r"STORED\s+AS\s+PARQUET\s+LOCATION\s+'([^']+)'", s, re.I | re.S
+        )
+        if m:
+            externa, si_no_existe, nombre, definicion, opciones, location = m.groups()
+            particiones = columnas_particion(opciones)
+            columnas = columnas_ddl(definicion) + particiones
+            particiones = [c for c, _ in particiones]
+            folder = self.ruta_local(location)
+            self.tablas[nombre] = (folder, columnas, particiones, columnas_orden(opciones))
+            # Tabla managed recreada: el DROP previo de Hive ya borró sus datos
+            if not externa and not si_no_existe and os.path.exists(folder):
+                shutil.rmtree(folder)
+            self.registrar_externa(nombre, folder, columnas, particiones)
+            if externa:
+                print(f"✓ {nombre} <- {folder}")
+            return
+
+        m = re.match(INSERT_RE, s, re.I | re.S)
+        if m:
+            self.insertar(*m.groups())
+            return
+
+        # Multi-insert: todos los INSERT ven la fuente como estaba antes del primero
+        m = re.match(r'FROM\s+(.*?)\s+(INSERT\s+(?:OVERWRITE|INTO)\s+TABLE\s.*)$', s, re.I | re.S)
+        if m:
+            fuente, inserts = m.groups()
+            self.con.execute(f"CREATE OR REPLACE TEMP TABLE multi__from AS SELECT * FROM {fuente}")
+            for clausula in re.split(r'\s+(?=INSERT\s+(?:OVERWRITE|INTO)\s+TABLE\s)', inserts, flags=re.I):
+                modo, nombre, particion, consulta = re.match(INSERT_RE, clausula, re.I | re.S).groups()
+                self.insertar(modo, nombre, particion, agregar_from(consulta, 'multi__from'))
+            self.con.execute("DROP TABLE multi__from")
+            return
+
+        m = re.match(r"CREATE\s+TABLE\s+(\w+)\s+(.*?)\bAS\s+((?:SELECT|WITH)\b.*)$", s, re.I | re.S)
+        if m:
+            nombre, opciones, consulta = m.groups()
+            location = re.search(r"LOCATION\s+'([^']+)'", opciones, re.I)
+            if not location:
+                raise ValueError(f"CREATE TABLE {nombre} sin LOCATION")
+            inicio = time.time()
+            self.eliminar(nombre)
+            self.con.execute(f"CREATE TABLE {nombre} AS {consulta}")
+            folder = self.ruta_local(location.group(1))
+            self.exportar(nombre, folder, enteros=columnas_row_number(consulta))
+            filas = self.con.execute(f"SELECT COUNT(*) FROM {nombre}").fetchone()[0]
+            print(f"✓ {nombre}: {filas:,} filas -> {folder} ({time.time() - inicio:.1f}s)")
+            return
+
+        if re.match(r'(SELECT|WITH)\b', s, re.I):
+            self.reporte(s)
+            return
+
+        raise ValueError(f"Sentencia no soportada en modo local:\n{s[:200]}")
+
+    def insertar(self, modo, nombre, particion, consulta):
+        """
+        INSERT OVERWRITE/INTO TABLE t [PARTITION (...)] consulta sobre una
+        tabla con DDL: se materializa, se exporta y se vuelve a registrar
+        """
+        folder, columnas, particiones, orden = self.tablas[nombre]
+        # DISTRIBUTE BY solo reparte entre reducers; SORT BY pasa a ser el orden del export
+        sort_by = re.search(r'\s+SORT\s+BY\s+([\w\s,]+)$', consulta, re.I)
+        if sort_by:
+            orden = [c.strip() for c in sort_by.group(1).split(',')]
+            consulta = consulta[:sort_by.start()]
+        consulta = re.sub(r'\s+DISTRIBUTE\s+BY\s+[\w\s,]+$', '', consulta, flags=re.I)
+
+        # PARTITION (decade='1950s') es estática; PARTITION (decade) dinámica
+        estaticas = {}
+        for item in (particion or '').split(','):
+            columna, _, valor = item.partition('=')
+            if valor.strip():
+                estaticas[columna.strip()] = valor.strip().strip("'")
+        if estaticas and set(estaticas) != set(particiones):
+            raise ValueError(f"{nombre}: particiones estáticas y dinámicas mezcladas")
+
+        inicio = time.time()
+        temporal = f"{nombre}__insert"
+        definicion = ', '.join(f"{col} {tipo}" for col, tipo in columnas)
+        self.con.execute(f"CREATE OR REPLACE TEMP TABLE {temporal} ({definicion})")
+        if estaticas:
+            literales = ', '.join(
+                "'" + estaticas[p].replace("'", "''") + "'" for p in particiones
+            )
+            self.con.execute(f"INSERT INTO {temporal} SELECT *, {literales} FROM ({consulta}) q")
+            valores = [tuple(estaticas[p] for p in particiones)]
+        else:
+            self.con.execute(f"INSERT INTO {temporal} {consulta}")
+            valores = None
+        self.exportar(temporal, folder, orden=orden, particiones=particiones,
+                      valores=valores, agregar=modo.upper() == 'INTO')
+        filas = self.con.execute(f"SELECT COUNT(*) FROM {temporal}").fetchone()[0]
+        self.con.execute(f"DROP TABLE {temporal}")
+        self.registrar_externa(nombre, folder, columnas, particiones)
+        destino = f"{nombre} ({particion})" if estaticas else nombre
+        print(f"✓ {destino}: {filas:,} filas -> {folder} ({time.time() - inicio:.1f}s)")
+
+    def correr_job(self, job):
+        """Registra las tablas base que haya en disco y ejecuta el .hql del job"""
+        for nombre, relativa in TABLAS_BASE.items():
+            self.registrar_externa(nombre, os.path.join(self.data_dir, relativa))
+
+        with open(os.path.join(SCRIPTS_DIR, JOBS[job]), encoding='utf-8') as f:
+            texto = f.read()
+        for nombre, valor in self.hivevars.items():
+            texto = texto.replace(f"${{hivevar:{nombre}}}", valor)
+        faltantes = sorted(set(re.findall(r'\$\{hivevar:(\w+)\}', texto)))
+        if faltantes:
+            raise ValueError(f"{JOBS[job]} necesita --hivevar {', '.join(faltantes)}")
+        for sentencia in sentencias(texto):
+            self.ejecutar(sentencia)
+
+
+def listar_partes(folder_path):
+    """
+    Part files de una carpeta Hive (sin _SUCCESS, $folder$ ni ocultos),
+    incluyendo los de las subcarpetas de partición col=valor
+    """
+    if not os.path.isdir(folder_path):
+        return []
+    partes = []
+    for f in sorted(os.listdir(folder_path)):
+        path = os.path.join(folder_path, f)
+        if f.startswith(('.', '_')) or f.endswith('$folder$'):
+            continue
+        if os.path.isfile(path):
+            partes.append(path)
+        elif '=' in f:
+            partes.extend(listar_partes(path))
+    return partes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jobs 2-4 y 6 en modo local (DuckDB)")
+    parser.add_argument('--data-dir', required=True, help="Raíz local equivalente a s3://.../music-data/")
+    parser.add_argument('--jobs', default='2,3,4,6', help="Jobs a correr en orden, p.ej. 3,4 (2i = job2_incremental.hql)")
+    parser.add_argument('--skip-reports', action='store_true', help="No ejecutar los SELECT de verificación")
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--hivevar', action='append', default=[], metavar='NOMBRE=VALOR',
+                        help="Variable ${hivevar:NOMBRE} de los .hql (se puede repetir)")
+    args = parser.parse_args()
+
+    if duckdb is None:
+        parser.error("el modo local necesita duckdb (pip install duckdb)")
+    jobs = args.jobs.split(',')
+    for job in jobs:
+        if job not in JOBS:
+            parser.error(f"job desconocido: {job} (disponibles: {', '.join(JOBS)})")
+
+    hivevars = {}
+    for definicion in args.hivevar:
+        nombre, separador, valor = definicion.partition('=')
+        if not separador:
+            parser.error(f"--hivevar espera NOMBRE=VALOR: {definicion}")
+        hivevars[nombre] = valor
+
+    pipeline = PipelineLocal(args.data_dir, skip_reports=args.skip_reports, hivevars=hivevars)
+    if args.threads:
+        pipeline.con.execute(f"SET threads = {args.threads}")
+
+    inicio_total = time.time()
+    for job in jobs:
+        print("=" * 80)
+        print(f"JOB {job} (LOCAL): {JOBS[job]}")
+        print("=" * 80)
+        inicio = time.time()
+        pipeline.correr_job(job)
+        print(f"\n✓ Job {job} completado en {time.time() - inicio:.1f}s\n")
+
+    print("=" * 80)
+    print(f"PIPELINE COMPLETADO EN {time.time() - inicio_total:.1f}s")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
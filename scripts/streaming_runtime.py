@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+============================================================================
+RUNTIME COMÚN PARA LOS MAPPERS/REDUCERS DE HADOOP STREAMING (JOBS 7-10)
+============================================================================
+- Entrada: sys.stdin.buffer leído en bloques grandes, líneas partidas como
+  bytes (sin decodificar a str ni un print por línea)
+- Salida: líneas acumuladas en un bytearray que se escribe en trozos grandes
+- Registros mal formados: se cuentan con contadores de Hadoop (stderr,
+  reporter:counter:...) en vez de desaparecer en un except Exception
+- Mappers con in-mapper combining: Combinador acumula sumas parciales por
+  clave y las emite cuando junta MAX_CLAVES claves distintas y al final
+- Reducers declarativos: agrupar() entrega (clave, iterador de valores) con
+  itertools.groupby en memoria constante y los agregadores (suma, suma/media
+  de vectores, suma por subclave, top-K con heapq.nlargest) consumen el grupo
+
+Se distribuye junto a los scripts:
+    -files streaming_runtime.py,job7_artist_plays_mapper.py,...
+============================================================================
+"""
+import heapq
+import sys
+from itertools import groupby, islice
+from operator import itemgetter
+
+BLOCK_SIZE = 1 << 20
+FLUSH_SIZE = 1 << 20
+LOTE = 4096
+MAX_CLAVES = 100000
+
+
+class Contadores:
+    """Contadores por nombre, reportados a Hadoop al cerrar"""
+
+    def __init__(self, grupo):
+        self.grupo = grupo
+        self.valores = {}
+
+    def sumar(self, nombre, cantidad=1):
+        self.valores[nombre] = self.valores.get(nombre, 0) + cantidad
+
+    def reportar(self, stream=None):
+        stream = stream or sys.stderr
+        for nombre, cantidad in self.valores.items():
+            stream.write(f"reporter:counter:{self.grupo},{nombre},{cantidad}\n")
+        stream.flush()
+
+
+class Salida:
+    """Buffer de salida: escribir(linea) con la línea en bytes, sin el \\n"""
+
+    def __init__(self, stream=None, flush_size=FLUSH_SIZE):
+        self.stream = stream or sys.stdout.buffer
+        self.flush_size = flush_size
+        self.buffer = bytearray()
+
+    def escribir(self, linea):
+        self.buffer += linea
+        self.buffer += b'\n'
+        if len(self.buffer) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.stream.write(self.buffer)
+            self.buffer.clear()
+        self.stream.flush()
+
+
+def lineas(stream=None, block_size=BLOCK_SIZE):
+    """Líneas no vacías de la entrada (bytes, sin espacios en los extremos)"""
+    stream = stream or sys.stdin.buffer
+    resto = b''
+    while True:
+        bloque = stream.read(block_size)
+        if not bloque:
+            break
+        partes = (resto + bloque).split(b'\n')
+        resto = partes.pop()
+        for linea in partes:
+            linea = linea.strip()
+            if linea:
+                yield linea
+    resto = resto.strip()
+    if resto:
+        yield resto
+
+
+def registros(contadores, min_campos, stream=None, separador=b'\t'):
+    """
+    Campos (bytes) de cada línea con al menos min_campos campos; las líneas
+    más cortas se cuentan como 'malformed_short'.
+    """
+    for linea in lineas(stream):
+        campos = linea.split(separador)
+        if len(campos) >= min_campos:
+            yield campos
+        else:
+            contadores.sumar('malformed_short')
+
+
+def minusculas(texto):
+    """lower() de bytes UTF-8 (el atajo ASCII evita decodificar casi siempre)"""
+    if texto.isascii():
+        return texto.lower()
+    return texto.decode('utf-8', 'replace').lower().encode('utf-8')
+
+
+class Combinador:
+    """
+    Sumas parciales por clave dentro del mapper, en el dict parciales. Las
+    claves nuevas entran con agregar(), que vacía el dict por la salida al
+    llegar a max_claves claves (la memoria queda acotada); las ya presentes
+    se actualizan en el propio mapper, sin una llamada por registro.
+    formatear(clave, parcial) devuelve la línea en bytes.
+    """
+
+    def __init__(self, salida, formatear, max_claves=MAX_CLAVES):
+        self.salida = salida
+        self.formatear = formatear
+        self.max_claves = max_claves
+        self.parciales = {}
+
+    def agregar(self, clave, parcial):
+        """Primera suma parcial de una clave"""
+        self.parciales[clave] = parcial
+        if len(self.parciales) >= self.max_claves:
+            self.vaciar()
+
+    def vaciar(self):
+        """Emite las sumas parciales y vacía el dict (también al terminar)"""
+        escribir, formatear = self.salida.escribir, self.formatear
+        for clave, parcial in self.parciales.items():
+            escribir(formatear(clave, parcial))
+        self.parciales.clear()
+
+
+def ejecutar(procesar, grupo):
+    """
+    Corre procesar(salida, contadores) con stdout bufferizado y reporta los
+    contadores al final (también si procesar falla).
+    """
+    contadores = Contadores(grupo)
+    salida = Salida()
+    try:
+        procesar(salida, contadores)
+    finally:
+        salida.flush()
+        contadores.reportar()
+
+
+# ============================================================================
+# REDUCERS: AGRUPACIÓN Y AGREGADORES
+# ============================================================================
+# Un agregador recibe (valores, contadores) con los valores (bytes) de una
+# clave y devuelve el resultado, o None si ningún valor era válido.
+
+def agrupar(filas):
+    """(clave, valores) por cada racha de la misma clave en la entrada ordenada"""
+    for clave, grupo in groupby(filas, key=itemgetter(0)):
+        yield clave, map(itemgetter(1), grupo)
+
+
+def _lotes(valores, tamano=LOTE):
+    """Valores de una clave en listas de a lo sumo tamano (memoria acotada)"""
+    while True:
+        lote = list(islice(valores, tamano))
+        if lote:
+            yield lote
+        if len(lote) < tamano:
+            return
+
+
+def suma(tipo=int):
+    """Suma de los valores"""
+    def agregar(valores, contadores):
+        total, validos = tipo(), 0
+        for lote in _lotes(valores):
+            try:
+                # Camino rápido: conversión y suma en C sobre todo el lote
+                total += sum(map(tipo, lote))
+                validos += len(lote)
+                continue
+            except ValueError:
+                pass
+            for valor in lote:
+                try:
+                    total += tipo(valor)
+                    validos += 1
+                except ValueError:
+                    contadores.sumar('malformed_value')
+        return total if validos else None
+    return agregar
+
+
+def suma_vector(tipos, separador=b','):
+    """Suma componente a componente de valores 'a,b,c' (un tipo por componente)"""
+    n = len(tipos)
+
+    def agregar(valores, contadores):
+        totales, validos = [t() for t in tipos], 0
+        for lote in _lotes(valores):
+            # Camino rápido: si todos los valores tienen exactamente n
+            # componentes, cada columna se convierte y suma en C. Se valida
+            # valor por valor: uno largo y uno corto no se compensan.
+            filas = [valor.split(separador) for valor in lote]
+            if set(map(len, filas)) == {n}:
+                try:
+                    sumas = [sum(map(t, columna)) for t, columna in zip(tipos, zip(*filas))]
+                except ValueError:
+                    sumas = None
+                if sumas is not None:
+                    for i, x in enumerate(sumas):
+                        totales[i] += x
+                    validos += len(lote)
+                    continue
+            for valor in lote:
+                try:
+                    partes = valor.split(separador)
+                    if len(partes) != n:
+                        raise ValueError(valor)
+                    partes = [t(x) for t, x in zip(tipos, partes)]
+                except ValueError:
+                    contadores.sumar('malformed_value')
+                    continue
+                for i, x in enumerate(partes):
+                    totales[i] += x
+                validos += 1
+        return totales if validos else None
+    return agregar
+
+
+def media_vector(tipos, separador=b','):
+    """
+    Valores 'n,s1,s2,...' (cantidad + sumas parciales): devuelve
+    (n_total, [s1/n_total, s2/n_total, ...])
+    """
+    sumar = suma_vector(tipos, separador)
+
+    def agregar(valores, contadores):
+        totales = sumar(valores, contadores)
+        if totales is None or totales[0] <= 0:
+            return None
+        n = totales[0]
+        return n, [s / n for s in totales[1:]]
+    return agregar
+
+
+def suma_por_subclave(tipo=int, separador=b':'):
+    """Valores 'subclave:x': dict subclave -> suma (en orden de aparición)"""
+    def agregar(valores, contadores):
+        totales = {}
+        get = totales.get
+        for lote in _lotes(valores):
+            # Camino rápido solo si cada valor es exactamente 'subclave:x'
+            filas = [valor.split(separador) for valor in lote]
+            if set(map(len, filas)) == {2}:
+                subclaves, crudos = zip(*filas)
+                try:
+                    xs = list(map(tipo, crudos))
+                except ValueError:
+                    xs = None
+                if xs is not None:
+                    for subclave, x in zip(subclaves, xs):
+                        totales[subclave] = get(subclave, 0) + x
+                    continue
+            for valor in lote:
+                try:
+                    subclave, x = valor.split(separador)
+                    x = tipo(x)
+                except ValueError:
+                    contadores.sumar('malformed_value')
+                    continue
+                totales[subclave] = get(subclave, 0) + x
+        return totales or None
+    return agregar
+
+
+def top_k(k, agregador):
+    """Los k (subclave, total) mayores de un agregador que devuelve un dict"""
+    def agregar(valores, contadores):
+        totales = agregador(valores, contadores)
+        if totales is None:
+            return None
+        # nlargest es estable como sorted(..., reverse=True)[:k] pero O(n log k)
+        return heapq.nlargest(k, totales.items(), key=itemgetter(1))
+    return agregar
+
+
+def reducir(grupo, agregador, emitir):
+    """
+    Reducer completo: registros clave\tvalor ordenados por clave, agregador
+    por clave y emitir(salida, clave, resultado) para cada resultado.
+    """
+    def procesar(salida, contadores):
+        for clave, valores in agrupar(registros(contadores, 2)):
+            resultado = agregador(valores, contadores)
+            if resultado is not None:
+                emitir(salida, clave, resultado)
+
+    ejecutar(procesar, grupo)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+ESCRITURA DE TABLAS PARQUET CON EL LAYOUT DE HIVE/SPARK
+============================================================================
+Carpeta con part files + _SUCCESS, como las que dejan mode('overwrite') y
+mode('append') en el cluster. La usan los modos locales del Job 5 y de los
+Jobs 7-10 para que el dashboard lea sus salidas igual que las de S3.
+============================================================================
+"""
+import os
+import shutil
+
+import pyarrow.parquet as pq
+
+
+def escribir_parte(table, path):
+    """Part file atómico: se escribe oculto (.tmp) y se renombra"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    pq.write_table(table, tmp_path, compression='snappy')
+    os.replace(tmp_path, path)
+
+
+def escribir_tabla(table, folder_path):
+    """
+    Reemplaza la carpeta por un único part file + _SUCCESS (como mode('overwrite')).
+    La versión nueva se escribe completa en una carpeta oculta hermana y recién
+    entonces se intercambia con os.replace: si el proceso muere a mitad de la
+    escritura la tabla anterior queda intacta.
+    """
+    padre, nombre = os.path.split(os.path.normpath(folder_path))
+    os.makedirs(padre, exist_ok=True)
+    tmp_dir = os.path.join(padre, f".{nombre}.tmp-{os.getpid()}")
+    vieja_dir = os.path.join(padre, f".{nombre}.old-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    pq.write_table(table, os.path.join(tmp_dir, 'part-00000.snappy.parquet'), compression='snappy')
+    open(os.path.join(tmp_dir, '_SUCCESS'), 'w').close()
+
+    # Un directorio no se puede pisar con os.replace: la vieja se aparta, la nueva
+    # toma su lugar y recién después se borra la vieja
+    if os.path.isdir(folder_path):
+        os.replace(folder_path, vieja_dir)
+    os.replace(tmp_dir, folder_path)
+    shutil.rmtree(vieja_dir, ignore_errors=True)